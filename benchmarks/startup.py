@@ -0,0 +1,238 @@
+"""
+The file is the benchmark of the cold start of the console application.
+Every entry point is started several times with `python -X importtime`,
+and the median time of its imports and of the whole run is reported.
+Besides option --help, compare.py is measured on a single pair of small
+files, which is the most common way to start it.
+The benchmark fails if an entry point imports a module which must be
+imported lazily, or if it starts longer than allowed. Run it from the
+root of the repository: `python -m benchmarks.startup`.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from argparse import ArgumentParser
+from typing import Dict, List, Set, Tuple
+
+import common.utils.stdout as stdout
+
+
+# The modules which are needed only by some of the options
+LAZY_MODULES = {
+    "compare.py": {
+        "common.utils.alignment",
+        "common.utils.structure",
+        "concurrent.futures",
+        "http.server",
+        "multiprocessing",
+        "sqlite3",
+        "tarfile",
+        "zipfile",
+    },
+    "merge.py": {
+        "multiprocessing",
+        "sqlite3",
+        "tarfile",
+        "zipfile",
+    },
+}
+
+# The modules which are needed only after the arguments are validated
+HELP_LAZY_MODULES = {
+    "compare.py": {
+        "common.objects.pipeline",
+        "common.objects.validator",
+        "common.utils.format",
+        "common.utils.metrics",
+        "common.utils.output",
+        "common.utils.shard",
+        "hashlib",
+    },
+}
+
+# Every entry point parses its arguments, so the start of the interpreter
+# which only imports argparse is the reference the limits are relative to
+REFERENCE_START = ("-c", "import argparse")
+
+# The limits of the median time of the imports in the times of the reference
+# start, about 10% above the measured ones. The original tree took 1.9 of
+# them to start compare.py with --help, and 1.8 to compare a single pair
+# without the content hashes and the archives
+IMPORT_BUDGETS = {
+    "compare.py --help": 1.6,
+    "compare.py one pair": 2.6,
+    "index.py --help": 2.6,
+    "merge.py --help": 2.0,
+    "serve.py --help": 4.8,
+}
+
+BENCHMARK_ARGUMENT_PARSER = ArgumentParser(
+    description="Measures the cold start of the entry points of CODERNA."
+)
+
+BENCHMARK_ARGUMENT_PARSER.add_argument(
+    "-r",
+    "--runs",
+    type=int,
+    default=10,
+    help="the number of starts of each entry point (default: 10)",
+)
+
+BENCHMARK_ARGUMENT_PARSER.add_argument(
+    "--max-ms",
+    type=float,
+    metavar="MS",
+    help="the limit of the median time of the imports of each entry point "
+    "(default: the budget of the entry point relative to the reference start)",
+)
+
+
+def create_one_pair(directory: str) -> List[str]:
+    """
+    Creates the input file with a single pair of small programs.
+
+    @param directory: The directory to create the files in
+    @return: The arguments of compare.py to compare the pair
+    """
+
+    programs = [
+        "def add(lhs, rhs):\n    return lhs + rhs\n",
+        "def total(items):\n    return sum(items)\n",
+    ]
+
+    paths = []
+    for number, program in enumerate(programs):
+        paths.append(os.path.join(directory, f"program{number}.py"))
+        with open(paths[-1], "w", encoding="utf-8") as file:
+            file.write(program)
+
+    input_path = os.path.join(directory, "input.txt")
+    with open(input_path, "w", encoding="utf-8") as file:
+        file.write(" ".join(paths) + "\n")
+
+    return [input_path, os.path.join(directory, "output.txt")]
+
+
+def measure_start(script: str, arguments: List[str]) -> Tuple[float, float, Set[str]]:
+    """
+    Starts the entry point once.
+
+    @param script: The path to the entry point
+    @param arguments: The arguments of the entry point
+    @return: The time of the imports and of the whole run in milliseconds,
+    and the names of the imported modules
+    """
+
+    started_at = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", script, *arguments],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    run_time = (time.perf_counter() - started_at) * 1000
+
+    import_time = 0
+    modules = set()
+
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # The header of the table
+
+        modules.add(name.strip())
+        if not name[1:].startswith(" "):
+            import_time += int(cumulative)  # Only the top-level imports
+
+    return import_time / 1000, run_time, modules
+
+
+if __name__ == "__main__":
+
+    args = BENCHMARK_ARGUMENT_PARSER.parse_args()
+    errors: List[str] = []
+    results: Dict[str, Tuple[float, float]] = {}
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        starts = [
+            (REFERENCE_START[0], "reference", list(REFERENCE_START[1:])),
+            ("compare.py", "--help", ["--help"]),
+            ("compare.py", "one pair", create_one_pair(temp_directory)),
+            ("index.py", "--help", ["--help"]),
+            ("merge.py", "--help", ["--help"]),
+            ("serve.py", "--help", ["--help"]),
+        ]
+
+        stdout.message(title="STARTUP", msg=f"Starting each entry point {args.runs} times.")
+        stdout.progress_bar(current=0, total=len(starts) * args.runs, title="STARTUP")
+
+        # The starts take turns, so a change of the load of the machine
+        # affects all of them and not only the relation to the reference
+        import_times: Dict[str, List[float]] = {}
+        run_times: Dict[str, List[float]] = {}
+
+        for run in range(args.runs):
+            for start_number, (start_script, start_name, start_arguments) in enumerate(starts):
+                start_import_time, start_run_time, start_modules = measure_start(
+                    start_script, start_arguments
+                )
+                import_times.setdefault(f"{start_script} {start_name}", []).append(
+                    start_import_time
+                )
+                run_times.setdefault(f"{start_script} {start_name}", []).append(start_run_time)
+
+                lazy_modules = LAZY_MODULES.get(start_script, set())
+                if start_arguments == ["--help"]:
+                    lazy_modules = lazy_modules | HELP_LAZY_MODULES.get(start_script, set())
+
+                for module in sorted(lazy_modules & start_modules):
+                    errors.append(
+                        f"The entry point {start_script} imports module {module} on start."
+                    )
+
+                stdout.progress_bar(
+                    current=run * len(starts) + start_number + 1,
+                    total=len(starts) * args.runs,
+                    title="STARTUP",
+                )
+
+        for start, start_import_times in import_times.items():
+            results[start] = (
+                statistics.median(start_import_times),
+                statistics.median(run_times[start]),
+            )
+
+    reference_time = results.pop(f"{REFERENCE_START[0]} reference")[0]
+    stdout.message(title="STARTUP", msg=f"Reference: imports {reference_time:.1f} ms.")
+
+    for start, (start_import_time, start_run_time) in results.items():
+        stdout.message(
+            title="STARTUP",
+            msg=f"{start}: imports {start_import_time:.1f} ms "
+            f"({start_import_time / reference_time:.2f} of the reference), "
+            f"run {start_run_time:.1f} ms.",
+        )
+
+        max_ms = args.max_ms
+        if max_ms is None:
+            max_ms = IMPORT_BUDGETS[start] * reference_time
+
+        if start_import_time > max_ms:
+            errors.append(
+                f"The imports of {start} take {start_import_time:.1f} ms, "
+                f"but the limit is {max_ms:.1f} ms."
+            )
+
+    for error in dict.fromkeys(errors):
+        stdout.message(title="ERROR", msg=error)
+
+    stdout.message(title="STARTUP", msg=f"Status: {'FAIL' if errors else 'FINISHED'}.")
+    sys.exit(1 if errors else 0)
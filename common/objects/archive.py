@@ -0,0 +1,228 @@
+"""
+The module describes the reader of zip and tar archives. A member of an
+archive is referred to as `path/to/bundle.zip::student42/main.py`. Every
+archive is opened only once, and its members are read straight from it,
+so there is no need to extract the submissions to the disk. The reader
+may be used from several threads: each archive is accessed under its own
+lock, so reading one archive doesn't block the others.
+Modules `zipfile` and `tarfile` are imported only when an archive is
+actually opened, since most runs never touch archives.
+"""
+
+import os
+
+from threading import RLock
+from typing import TYPE_CHECKING, Dict, List, Self, Tuple
+
+if TYPE_CHECKING:
+    import tarfile
+    import zipfile
+
+
+MEMBER_SEPARATOR = "::"
+
+
+class ArchiveReader(object):
+    """
+    A class that keeps the archives open and reads their members.
+    """
+
+    __slots__ = [
+        "_archives",
+        "_lock",
+        "_locks",
+        "_members",
+        "_signatures",
+    ]
+
+    def __init__(self: Self) -> None:
+        self._archives: Dict[str, "zipfile.ZipFile | tarfile.TarFile"] = {}
+        self._members: Dict[str, Dict[str, "zipfile.ZipInfo | tarfile.TarInfo"]] = {}
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        self._lock = RLock()  # Guards the locks of the archives
+        self._locks: Dict[str, RLock] = {}
+
+    def open(self: Self, archive_path: str) -> "zipfile.ZipFile | tarfile.TarFile":
+        """
+        Opens the archive if it has not been opened yet or has been
+        modified since it was opened.
+
+        @param archive_path: The path to the archive
+        @return: The opened archive
+        """
+
+        import tarfile  # pylint: disable=import-outside-toplevel
+        import zipfile  # pylint: disable=import-outside-toplevel
+
+        with self.get_lock(archive_path):
+            file_stat = os.stat(archive_path)
+            signature = (file_stat.st_mtime_ns, file_stat.st_size)
+
+            if archive_path in self._archives and self._signatures[archive_path] != signature:
+                self._archives.pop(archive_path).close()
+
+            if archive_path not in self._archives:
+                if zipfile.is_zipfile(archive_path):
+                    archive = zipfile.ZipFile(archive_path)
+                    members = {
+                        info.filename: info for info in archive.infolist() if not info.is_dir()
+                    }
+
+                elif tarfile.is_tarfile(archive_path):
+                    archive = tarfile.open(archive_path, mode="r:*")
+                    members = {info.name: info for info in archive.getmembers() if info.isfile()}
+
+                else:
+                    raise ValueError(f"The file is neither a zip nor a tar archive: {archive_path}")
+
+                self._archives[archive_path] = archive
+                self._members[archive_path] = members
+                self._signatures[archive_path] = signature
+
+            return self._archives[archive_path]
+
+    def get_lock(self: Self, archive_path: str) -> RLock:
+        """
+        Returns the lock of the archive.
+        """
+
+        with self._lock:
+            return self._locks.setdefault(archive_path, RLock())
+
+    def is_archive(self: Self, archive_path: str) -> bool:
+        """
+        Checks whether the file is a readable zip or tar archive.
+        """
+
+        import tarfile  # pylint: disable=import-outside-toplevel
+        import zipfile  # pylint: disable=import-outside-toplevel
+
+        if not os.path.isfile(archive_path):
+            return False
+
+        try:
+            self.open(archive_path)
+
+        except (OSError, ValueError, zipfile.BadZipFile, tarfile.TarError):
+            return False
+
+        return True
+
+    def exists(self: Self, path: str) -> bool:
+        """
+        Checks whether the member of the archive exists.
+        """
+
+        archive_path, member = split_member_path(path)
+        return self.is_archive(archive_path) and member in self._members[archive_path]
+
+    def read(self: Self, path: str) -> str:
+        """
+        Reads the member of the archive.
+
+        @param path: The path to the member of the archive
+        @return: The decoded content of the member
+        """
+
+        import zipfile  # pylint: disable=import-outside-toplevel
+
+        archive_path, member = split_member_path(path)
+
+        with self.get_lock(archive_path):
+            archive = self.open(archive_path)
+
+            if member not in self._members[archive_path]:
+                raise FileNotFoundError(f"The archive has no such member: {path}")
+
+            if isinstance(archive, zipfile.ZipFile):
+                with archive.open(self._members[archive_path][member]) as file:
+                    return file.read().decode("utf-8")
+
+            with archive.extractfile(self._members[archive_path][member]) as file:
+                return file.read().decode("utf-8")
+
+    def get_size(self: Self, path: str) -> int:
+        """
+        Returns the uncompressed size of the member of the archive.
+        """
+
+        import zipfile  # pylint: disable=import-outside-toplevel
+
+        archive_path, member = split_member_path(path)
+        self.open(archive_path)
+
+        info = self._members[archive_path][member]
+        return info.file_size if isinstance(info, zipfile.ZipInfo) else info.size
+
+    def get_offset(self: Self, path: str) -> int:
+        """
+        Returns the position of the member in the archive. Reading members
+        in the order of their positions never seeks backwards, which is
+        important for compressed tar archives.
+        """
+
+        import zipfile  # pylint: disable=import-outside-toplevel
+
+        archive_path, member = split_member_path(path)
+        self.open(archive_path)
+
+        info = self._members[archive_path][member]
+        return info.header_offset if isinstance(info, zipfile.ZipInfo) else info.offset
+
+    def list_members(self: Self, archive_path: str, extension: str = ".py") -> List[str]:
+        """
+        Returns the paths to the members of the archive with the given
+        extension in the order of their positions in the archive.
+        """
+
+        self.open(archive_path)
+
+        return sorted(
+            (
+                join_member_path(archive_path, member)
+                for member in self._members[archive_path]
+                if member.endswith(extension)
+            ),
+            key=self.get_offset,
+        )
+
+    def close(self: Self) -> None:
+        """
+        Closes all the opened archives.
+        """
+
+        for archive in self._archives.values():
+            archive.close()
+
+        self._archives = {}
+        self._members = {}
+        self._signatures = {}
+
+
+def is_member_path(path: str) -> bool:
+    """
+    Checks whether the path refers to a member of an archive.
+    """
+
+    return MEMBER_SEPARATOR in path
+
+
+def split_member_path(path: str) -> Tuple[str, str]:
+    """
+    Splits the path to a member into the path to the archive and the
+    name of the member inside the archive.
+    """
+
+    archive_path, _, member = path.partition(MEMBER_SEPARATOR)
+    return archive_path, member
+
+
+def join_member_path(archive_path: str, member: str) -> str:
+    """
+    Builds the path to a member of the archive.
+    """
+
+    return f"{archive_path}{MEMBER_SEPARATOR}{member}"
+
+
+ARCHIVE_READER = ArchiveReader()
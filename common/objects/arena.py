@@ -0,0 +1,133 @@
+"""
+The module describes the corpus arena: all the normalized programs packed
+into one block of shared memory. Worker processes attach to the block by
+its name and decode the programs straight from it, so the memory doesn't
+grow with the number of workers and tasks carry only integer IDs.
+
+The layout of the block is the following: the number of programs, then
+the offsets of both formatting variants of every program, then the
+variants themselves encoded in UTF-8. Only the pair of programs which is
+being compared is decoded, since the Levenshtein algorithm works much
+faster with strings than with views of the memory.
+"""
+
+import struct
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Self
+
+from common.utils.format import NormalizedCode
+
+
+HEADER_FORMAT = "Q"
+OFFSET_FORMAT = "Q"
+
+
+class CorpusArena(object):
+    """
+    A class that implements the corpus of normalized programs
+    stored in shared memory.
+    """
+
+    __slots__ = [
+        "_memory",
+        "_offsets",
+        "_owner",
+    ]
+
+    def __init__(self: Self, memory: SharedMemory, owner: bool) -> None:
+        self._memory = memory
+        self._owner = owner
+
+        header_size = struct.calcsize(HEADER_FORMAT)
+        (count,) = struct.unpack_from(HEADER_FORMAT, memory.buf, 0)
+
+        self._offsets = memory.buf[
+            header_size:header_size + (2 * count + 1) * struct.calcsize(OFFSET_FORMAT)
+        ].cast(OFFSET_FORMAT)
+
+    def __len__(self: Self) -> int:
+        return (len(self._offsets) - 1) // 2
+
+    @property
+    def name(self: Self) -> str:
+        """
+        The name of the shared memory block to attach to.
+        """
+
+        return self._memory.name
+
+    @classmethod
+    def create(cls: type, programs: List[NormalizedCode]) -> "CorpusArena":
+        """
+        Packs the programs into a new block of shared memory. The i-th
+        program can be read by the ID i.
+
+        @param programs: The normalized programs to pack
+        @return: The arena which owns the block
+        """
+
+        variants = [
+            variant.encode("utf-8")
+            for program in programs
+            for variant in program
+        ]
+
+        header_size = struct.calcsize(HEADER_FORMAT)
+        offset = header_size + (len(variants) + 1) * struct.calcsize(OFFSET_FORMAT)
+
+        offsets = [offset]
+        for variant in variants:
+            offset += len(variant)
+            offsets.append(offset)
+
+        memory = SharedMemory(create=True, size=max(offset, 1))
+        struct.pack_into(HEADER_FORMAT, memory.buf, 0, len(programs))
+        struct.pack_into(f"{len(offsets)}{OFFSET_FORMAT}", memory.buf, header_size, *offsets)
+
+        for start, end, variant in zip(offsets, offsets[1:], variants):
+            memory.buf[start:end] = variant
+
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls: type, name: str) -> "CorpusArena":
+        """
+        Attaches to the block of shared memory created by another process.
+
+        @param name: The name of the block
+        @return: The arena which doesn't own the block
+        """
+
+        return cls(SharedMemory(name=name), owner=False)
+
+    def get(self: Self, program_id: int) -> NormalizedCode:
+        """
+        Decodes both formatting variants of the program.
+
+        @param program_id: The ID of the program
+        @return: The normalized program
+        """
+
+        return NormalizedCode(*(
+            str(
+                self._memory.buf[
+                    self._offsets[2 * program_id + variant]:
+                    self._offsets[2 * program_id + variant + 1]
+                ],
+                "utf-8",
+            )
+            for variant in range(2)
+        ))
+
+    def close(self: Self) -> None:
+        """
+        Releases the views and detaches from the block. The owner of
+        the block also destroys it.
+        """
+
+        self._offsets.release()
+        self._memory.close()
+
+        if self._owner:
+            self._memory.unlink()
@@ -4,20 +4,37 @@ handlers is a descendant of the NodeTransformer class, which is
 the preferred means for working with classes of the ast module.
 """
 
-from ast import NodeTransformer
+from ast import NodeTransformer, iter_child_nodes
 
 from ast import (
+    AST,
     AnnAssign,
     AsyncFunctionDef,
     Assign,
+    DictComp,
+    ExceptHandler,
     Expr,
     FunctionDef,
+    GeneratorExp,
+    Global,
     ClassDef,
     Constant,
+    Import,
+    ImportFrom,
+    Lambda,
+    ListComp,
+    Load,
     Module,
+    Name,
+    Nonlocal,
+    SetComp,
+    arguments,
 )
 
-from typing import Self
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Self, Tuple
+
+
+Comprehension = DictComp | GeneratorExp | ListComp | SetComp
 
 
 class TypeHintCleaner(NodeTransformer):
@@ -218,3 +235,386 @@ class UnusedConstantCleaner(NodeTransformer):
 
         self.generic_visit(node)
         return self.clean(node)
+
+
+class Scope(NamedTuple):
+    """
+    Names bound in a scope and their canonical replacements. Names which
+    are kept as they are map to themselves, so they still shadow the names
+    of the enclosing scopes. The counters are the numbers of canonical
+    names used by the scope and all its enclosing scopes.
+    """
+
+    names: Dict[str, str]
+    is_class: bool
+    variables: int
+    modules: int
+
+
+class IdentifierCanonicalizer(NodeTransformer):
+    """
+    Descendant of the NodeTransformer class, designed to rename arguments,
+    local variables and import aliases to canonical positional names.
+    """
+
+    __slots__ = [
+        "_scopes",
+    ]
+
+    def __init__(self: Self) -> None:
+        self._scopes: List[Scope] = []
+
+    def visit_Module(self: Self, node: Module) -> Module:  # pylint: disable=invalid-name
+        """
+        Method for renaming identifiers in the program. Only import
+        aliases are renamed in the module scope, since global names
+        may be used by other modules. For example, the following
+        transformation takes place:
+
+        ```
+        import numpy as np
+
+        def norm(vector, power=2):
+            total = np.sum(np.abs(vector) ** power)
+            return total ** (1 / power)
+        ```
+
+        Will be transformed to:
+
+        ```
+        import numpy as _m0
+
+        def norm(_v0, _v1=2):
+            _v2 = _m0.sum(_m0.abs(_v0) ** _v1)
+            return _v2 ** (1 / _v1)
+        ```
+        """
+
+        self._scopes = [self.create_scope(node.body)]
+        self.generic_visit(node)
+        self._scopes.pop()
+
+        return node
+
+    def visit_FunctionDef(  # pylint: disable=invalid-name
+        self: Self,
+        node: FunctionDef | AsyncFunctionDef
+    ) -> FunctionDef | AsyncFunctionDef:
+        """
+        Method for renaming arguments and local variables of functions.
+        Decorators and defaults are evaluated in the enclosing scope.
+        To get some examples look at method `visit_Module`.
+        """
+
+        self.visit_all(node.decorator_list)
+        self.visit_defaults(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+
+        self._scopes.append(self.create_scope(node.body, node.args))
+        self.rename_arguments(node.args)
+        self.visit_all(node.body)
+        self._scopes.pop()
+
+        return node
+
+    def visit_AsyncFunctionDef(  # pylint: disable=invalid-name
+        self: Self,
+        node: AsyncFunctionDef
+    ) -> AsyncFunctionDef:
+        """
+        Method for renaming arguments and local variables of async functions.
+        To get some examples look at method `visit_Module`.
+        """
+
+        return self.visit_FunctionDef(node)
+
+    def visit_Lambda(self: Self, node: Lambda) -> Lambda:  # pylint: disable=invalid-name
+        """
+        Method for renaming arguments of lambdas.
+        """
+
+        self.visit_defaults(node.args)
+
+        self._scopes.append(self.create_scope([node.body], node.args))
+        self.rename_arguments(node.args)
+        self.visit(node.body)
+        self._scopes.pop()
+
+        return node
+
+    def visit_ClassDef(self: Self, node: ClassDef) -> ClassDef:  # pylint: disable=invalid-name
+        """
+        Method for visiting classes. Names bound in the class body are
+        attributes, so they are kept, but they shadow the enclosing names
+        inside the class body.
+        """
+
+        self.visit_all(node.decorator_list)
+        self.visit_all(node.bases)
+        self.visit_all(node.keywords)
+
+        enclosing = self._scopes[-1]
+        self._scopes.append(Scope(
+            names={name: name for name, _ in collect_bindings(node.body)},
+            is_class=True,
+            variables=enclosing.variables,
+            modules=enclosing.modules,
+        ))
+
+        self.visit_all(node.body)
+        self._scopes.pop()
+
+        return node
+
+    def visit_scoped_comprehension(self: Self, node: Comprehension) -> Comprehension:
+        """
+        Method for renaming the targets of comprehensions, which have
+        their own scope. The first iterable is evaluated in the
+        enclosing scope.
+        """
+
+        self.visit(node.generators[0].iter)
+
+        enclosing = self._scopes[-1]
+        names: Dict[str, str] = {}
+        for generator in node.generators:
+            for target in walk_targets(generator.target):
+                if target.id not in names:
+                    names[target.id] = f"_v{enclosing.variables + len(names)}"
+
+        self._scopes.append(Scope(
+            names=names,
+            is_class=False,
+            variables=enclosing.variables + len(names),
+            modules=enclosing.modules,
+        ))
+
+        for index, generator in enumerate(node.generators):
+            self.visit(generator.target)
+            if index > 0:
+                self.visit(generator.iter)
+
+            self.visit_all(generator.ifs)
+
+        for field in ["elt", "key", "value"]:
+            if hasattr(node, field):
+                self.visit(getattr(node, field))
+
+        self._scopes.pop()
+
+        return node
+
+    visit_DictComp = visit_scoped_comprehension  # pylint: disable=invalid-name
+    visit_GeneratorExp = visit_scoped_comprehension  # pylint: disable=invalid-name
+    visit_ListComp = visit_scoped_comprehension  # pylint: disable=invalid-name
+    visit_SetComp = visit_scoped_comprehension  # pylint: disable=invalid-name
+
+    def visit_Name(self: Self, node: Name) -> Name:  # pylint: disable=invalid-name
+        """
+        Method for renaming usages of variables.
+        """
+
+        node.id = self.lookup(node.id)
+        return node
+
+    def visit_ExceptHandler(  # pylint: disable=invalid-name
+        self: Self,
+        node: ExceptHandler
+    ) -> ExceptHandler:
+        """
+        Method for renaming the names of caught exceptions.
+        """
+
+        if node.name is not None:
+            node.name = self.lookup(node.name)
+
+        self.generic_visit(node)
+        return node
+
+    def visit_Import(self: Self, node: Import | ImportFrom) -> Import | ImportFrom:  # pylint: disable=invalid-name
+        """
+        Method for renaming import aliases.
+        """
+
+        for alias in node.names:
+            if alias.asname is not None:
+                alias.asname = self.lookup(alias.asname)
+
+        return node
+
+    def visit_ImportFrom(self: Self, node: ImportFrom) -> ImportFrom:  # pylint: disable=invalid-name
+        """
+        Method for renaming import aliases.
+        """
+
+        return self.visit_Import(node)
+
+    def visit_Nonlocal(self: Self, node: Nonlocal) -> Nonlocal:  # pylint: disable=invalid-name
+        """
+        Method for renaming variables of the enclosing functions.
+        """
+
+        node.names = [self.lookup(name) for name in node.names]
+        return node
+
+    def visit_all(self: Self, nodes: Iterable[AST]) -> None:
+        """
+        Visits the nodes. Identifiers are renamed in place, so the
+        nodes themselves are never replaced.
+        """
+
+        for node in nodes:
+            self.visit(node)
+
+    def visit_defaults(self: Self, node: arguments) -> None:
+        """
+        Visits the default values of the arguments.
+        """
+
+        self.visit_all(node.defaults)
+        self.visit_all(default for default in node.kw_defaults if default is not None)
+
+    def rename_arguments(self: Self, node: arguments) -> None:
+        """
+        Renames the arguments of a function in the current scope.
+        """
+
+        for argument in get_arguments(node):
+            argument.arg = self.lookup(argument.arg)
+
+    def lookup(self: Self, name: str) -> str:
+        """
+        Returns the canonical name for the name in the current scope.
+        Class scopes are only visible from their own bodies.
+        """
+
+        for depth, scope in enumerate(reversed(self._scopes)):
+            if scope.is_class and depth > 0:
+                continue
+
+            if name in scope.names:
+                return scope.names[name]
+
+        return name
+
+    def create_scope(self: Self, body: List[AST], args: arguments | None = None) -> Scope:
+        """
+        Creates the scope of a function or of the module. Canonical names
+        continue the numbering of the enclosing scope, so a nested scope
+        never reuses a name which is visible in it.
+        """
+
+        enclosing = self._scopes[-1] if self._scopes else Scope({}, False, 0, 0)
+        variables = enclosing.variables
+        modules = enclosing.modules
+        names: Dict[str, str] = {}
+
+        def bind(name: str, prefix: str | None) -> None:
+            nonlocal variables, modules
+
+            if name in names:
+                return
+
+            if prefix == "_v":
+                names[name] = f"_v{variables}"
+                variables += 1
+
+            elif prefix == "_m":
+                names[name] = f"_m{modules}"
+                modules += 1
+
+            else:
+                names[name] = name
+
+        for argument in get_arguments(args) if args is not None else []:
+            bind(argument.arg, "_v")
+
+        declared = {
+            name
+            for node in walk_scope(body)
+            if isinstance(node, (Global, Nonlocal))
+            for name in node.names
+        }
+
+        is_module = args is None and not self._scopes
+        for name, prefix in collect_bindings(body):
+            if name in declared:
+                continue
+
+            if is_module and prefix == "_v":
+                continue
+
+            bind(name, prefix)
+
+        return Scope(names=names, is_class=False, variables=variables, modules=modules)
+
+
+def collect_bindings(body: List[AST]) -> Iterator[Tuple[str, str | None]]:
+    """
+    Yields the names bound directly in the scope together with the
+    prefix of their canonical names, or None if the name is kept.
+    """
+
+    for node in walk_scope(body):
+        if isinstance(node, Name) and not isinstance(node.ctx, Load):
+            yield node.id, "_v"
+
+        elif isinstance(node, ExceptHandler) and node.name is not None:
+            yield node.name, "_v"
+
+        elif isinstance(node, (Import, ImportFrom)):
+            for alias in node.names:
+                if alias.asname is not None:
+                    yield alias.asname, "_m"
+
+                elif alias.name != "*":
+                    yield alias.name.split(".")[0], None
+
+        elif isinstance(node, (FunctionDef, AsyncFunctionDef, ClassDef)):
+            yield node.name, None
+
+
+def get_arguments(node: arguments) -> List[AST]:
+    """
+    Returns all the arguments of a function in the order of declaration.
+    """
+
+    return [
+        *node.posonlyargs,
+        *node.args,
+        *([node.vararg] if node.vararg is not None else []),
+        *node.kwonlyargs,
+        *([node.kwarg] if node.kwarg is not None else []),
+    ]
+
+
+def walk_scope(body: List[AST]) -> Iterator[AST]:
+    """
+    Yields the nodes of the scope in the order of the source code. Bodies
+    of nested functions, classes and comprehensions are not entered, but
+    the nested definitions themselves are yielded.
+    """
+
+    stack = list(reversed(body))
+    while stack:
+        node = stack.pop()
+        yield node
+
+        if isinstance(node, (FunctionDef, AsyncFunctionDef, ClassDef, Lambda)):
+            continue
+
+        if isinstance(node, Comprehension):
+            continue
+
+        stack.extend(reversed(list(iter_child_nodes(node))))
+
+
+def walk_targets(node: AST) -> Iterator[Name]:
+    """
+    Yields the names assigned by the target of a comprehension.
+    """
+
+    for child in walk_scope([node]):
+        if isinstance(child, Name):
+            yield child
@@ -0,0 +1,118 @@
+"""
+The module describes the cache of normalized programs. Normalization is
+the most expensive step after the Levenshtein algorithm itself, so every
+program is normalized only once, no matter how many times it is compared.
+Programs are normalized lazily: a program whose pairs are all known in
+advance is never normalized at all. A long-living process can bound the
+number of the stored programs, so the least recently used are dropped.
+"""
+
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Hashable, Self, Tuple
+
+from common.utils.file import get_content_hash
+from common.utils.format import NormalizedCode, normalize_with_tree
+
+
+class LRUDict(OrderedDict):
+    """
+    Descendant of the OrderedDict class, which keeps at most the given
+    number of items and drops the least recently used ones first.
+    """
+
+    __slots__ = [
+        "max_size",
+    ]
+
+    def __init__(self: Self, max_size: int | None = None) -> None:
+        super().__init__()
+        self.max_size = max_size  # None means the size is not bounded
+
+    def __getitem__(self: Self, key: Hashable) -> Any:
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+
+        return value
+
+    def __setitem__(self: Self, key: Hashable, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+
+        if self.max_size is not None and len(self) > self.max_size:
+            self.popitem(last=False)
+
+
+class NormalizationCache(object):
+    """
+    A class that stores normalized programs by the hash of their content.
+    If required, structure fingerprints are built together with them.
+    """
+
+    __slots__ = [
+        "_entries",
+        "_sources",
+        "_structural",
+    ]
+
+    def __init__(self: Self, structural: bool = False, max_size: int | None = None) -> None:
+        # Normalized programs and their structure fingerprints
+        self._entries: Dict[str, Tuple[NormalizedCode, Counter | None]] = LRUDict(max_size)
+        self._sources: Dict[str, str] = {}  # Not normalized yet
+        self._structural = structural
+
+    def __len__(self: Self) -> int:
+        return len(self._entries) + len(self._sources)
+
+    def __contains__(self: Self, content_hash: str) -> bool:
+        return content_hash in self._entries or content_hash in self._sources
+
+    def add(self: Self, code: str) -> str:
+        """
+        Remembers the code to normalize it when it is needed.
+
+        @param code: Python code that should be normalized
+        @return: The hash of the code content
+        """
+
+        content_hash = get_content_hash(code)
+        if content_hash not in self:
+            self._sources[content_hash] = code
+
+        return content_hash
+
+    def get(self: Self, content_hash: str) -> NormalizedCode:
+        """
+        Returns the normalized program by the hash of its content. If the
+        normalization fails, the program is forgotten, so it can be added
+        again and fail with the same error.
+        """
+
+        if content_hash in self._sources:
+            normalized_code, sorted_tree = normalize_with_tree(self._sources.pop(content_hash))
+
+            fingerprint = None
+            if self._structural:
+                from common.utils.structure import get_structure_fingerprint  # pylint: disable=import-outside-toplevel
+
+                fingerprint = get_structure_fingerprint(sorted_tree)
+
+            self._entries[content_hash] = (normalized_code, fingerprint)
+
+        return self._entries[content_hash][0]
+
+    def get_structure(self: Self, content_hash: str) -> Counter:
+        """
+        Returns the structure fingerprint of the program by the hash of
+        its content. The cache must be created with `structural=True`.
+        """
+
+        self.get(content_hash)
+        return self._entries[content_hash][1]
+
+    def discard(self: Self, content_hash: str) -> None:
+        """
+        Forgets the program, e.g. when the file it was read from has changed.
+        """
+
+        self._entries.pop(content_hash, None)
+        self._sources.pop(content_hash, None)
@@ -0,0 +1,188 @@
+"""
+The module describes the corpus index. The index keeps the normalized
+forms of already submitted programs together with their cheap features,
+so a new program can be compared with the whole corpus without reading
+and normalizing the corpus again.
+"""
+
+import heapq
+import json
+import os
+
+from collections import Counter
+from typing import Dict, List, NamedTuple, Self, Tuple
+
+from common.utils.bounds import get_histogram_upper_bound
+from common.utils.file import get_content_hash, read_source
+from common.utils.format import NormalizedCode, normalize
+from common.utils.metrics import calculate_normalized_metric
+
+
+INDEX_VERSION = 2
+
+
+class IndexEntry(NamedTuple):
+    """
+    A program stored in the corpus index.
+    """
+
+    path: str
+    canonical_hash: str  # Of the unsorted form, equal for renamed copies
+    forms: NormalizedCode
+    histograms: Tuple[Counter, Counter]  # Of the unsorted and sorted forms
+
+
+class CorpusIndex(object):
+    """
+    A class that implements the persistent index of the corpus.
+    """
+
+    __slots__ = [
+        "_entries",
+    ]
+
+    def __init__(self: Self) -> None:
+        self._entries: Dict[str, IndexEntry] = {}
+
+    def __len__(self: Self) -> int:
+        return len(self._entries)
+
+    def add(self: Self, path: str) -> None:
+        """
+        Adds the file to the index. If the file has been already added,
+        its entry is replaced.
+
+        @param path: The path to the file
+        """
+
+        forms = normalize(read_source(path))
+
+        self._entries[path] = IndexEntry(
+            path=path,
+            canonical_hash=get_content_hash(forms.unsorted),
+            forms=forms,
+            histograms=(Counter(forms.unsorted), Counter(forms.sorted)),
+        )
+
+    def query(
+        self: Self,
+        code: str,
+        k: int,
+        exclude: str | None = None
+    ) -> List[Tuple[str, float]]:
+
+        """
+        Finds the k programs of the index which are most similar to the
+        given code. Programs are scored in the descending order of their
+        upper bounds, and the search stops as soon as the bound of the
+        next program can't beat the k-th best score.
+
+        @param code: Python code to look for
+        @param k: The number of programs to return
+        @param exclude: The path of the program to skip, e.g. the queried one
+        @return: Pairs of paths and ratios sorted by the ratio
+        """
+
+        if k <= 0:
+            return []
+
+        forms = normalize(code)
+        canonical_hash = get_content_hash(forms.unsorted)
+        histograms = (Counter(forms.unsorted), Counter(forms.sorted))
+
+        candidates = []
+        for entry in self._entries.values():
+            if entry.path == exclude:
+                continue
+
+            bound = 1.0 if entry.canonical_hash == canonical_hash else max(
+                get_histogram_upper_bound(
+                    histograms[variant],
+                    entry.histograms[variant],
+                    len(forms[variant]),
+                    len(entry.forms[variant]),
+                )
+                for variant in range(2)
+            )
+            candidates.append((bound, entry))
+
+        candidates.sort(key=lambda candidate: (-candidate[0], candidate[1].path))
+
+        best: List[Tuple[float, str]] = []  # Min-heap of the k best results
+        for bound, entry in candidates:
+            if len(best) == k and bound <= best[0][0]:
+                break
+
+            if entry.canonical_hash == canonical_hash:
+                ratio = 1.0
+
+            else:
+                ratio = calculate_normalized_metric(forms, entry.forms)
+
+            if len(best) < k:
+                heapq.heappush(best, (ratio, entry.path))
+
+            elif ratio > best[0][0]:
+                heapq.heapreplace(best, (ratio, entry.path))
+
+        return [
+            (path, ratio)
+            for ratio, path in sorted(best, key=lambda item: (-item[0], item[1]))
+        ]
+
+    def save(self: Self, path: str) -> None:
+        """
+        Writes the index to the file. The file is replaced atomically.
+
+        @param path: The path to the index file
+        """
+
+        temporary_path = f"{path}.tmp"
+        with open(file=temporary_path, mode="w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "entries": [
+                        {
+                            "path": entry.path,
+                            "canonical_hash": entry.canonical_hash,
+                            "unsorted": entry.forms.unsorted,
+                            "sorted": entry.forms.sorted,
+                            "histograms": entry.histograms,
+                        }
+                        for entry in self._entries.values()
+                    ],
+                },
+                file,
+            )
+
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls: type, path: str) -> "CorpusIndex":
+        """
+        Reads the index from the file.
+
+        @param path: The path to the index file
+        @return: The loaded index
+        """
+
+        with open(file=path, mode="r", encoding="utf-8") as file:
+            data = json.load(file)
+
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(
+                f"The index has version {data.get('version')}, "
+                f"but version {INDEX_VERSION} is required."
+            )
+
+        index = cls()
+        for item in data["entries"]:
+            index._entries[item["path"]] = IndexEntry(
+                path=item["path"],
+                canonical_hash=item["canonical_hash"],
+                forms=NormalizedCode(unsorted=item["unsorted"], sorted=item["sorted"]),
+                histograms=tuple(Counter(histogram) for histogram in item["histograms"]),
+            )
+
+        return index
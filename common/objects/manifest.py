@@ -0,0 +1,81 @@
+"""
+The module describes the results manifest. The manifest keeps the results
+of already compared pairs by the content hashes of both files, so a rerun
+computes only the pairs where any of the files has changed. The results
+are valid only for the version of the metric they were computed with.
+"""
+
+import json
+import os
+
+from typing import Dict, Self, Tuple
+
+from common.utils.metrics import METRIC_VERSION, MetricResult
+
+
+class ResultsManifest(object):
+    """
+    A class that implements the persistent storage of computed results.
+    """
+
+    __slots__ = [
+        "_path",
+        "_results",
+    ]
+
+    def __init__(self: Self, path: str) -> None:
+        self._path = path
+        self._results: Dict[Tuple[str, str], MetricResult] = {}
+
+        if not os.path.exists(path):
+            return
+
+        with open(file=path, mode="r", encoding="utf-8") as file:
+            data = json.load(file)
+
+        if data.get("version") != METRIC_VERSION:
+            return  # The results were computed by another metric
+
+        for key, result in data.get("results", {}).items():
+            lh_hash, rh_hash = key.split(":")
+            self._results[(lh_hash, rh_hash)] = MetricResult(*result)
+
+    def __len__(self: Self) -> int:
+        return len(self._results)
+
+    def __contains__(self: Self, key: Tuple[str, str]) -> bool:
+        return key in self._results
+
+    def get(self: Self, key: Tuple[str, str]) -> MetricResult:
+        """
+        Returns the result of the pair by the key of the pair.
+        """
+
+        return self._results[key]
+
+    def set(self: Self, key: Tuple[str, str], result: MetricResult) -> None:
+        """
+        Remembers the result of the pair by the key of the pair.
+        """
+
+        self._results[key] = result
+
+    def save(self: Self) -> None:
+        """
+        Writes the manifest to its file. The file is replaced atomically.
+        """
+
+        temporary_path = f"{self._path}.tmp"
+        with open(file=temporary_path, mode="w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "version": METRIC_VERSION,
+                    "results": {
+                        f"{lh_hash}:{rh_hash}": list(result)
+                        for (lh_hash, rh_hash), result in self._results.items()
+                    },
+                },
+                file,
+            )
+
+        os.replace(temporary_path, self._path)
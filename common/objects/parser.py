@@ -3,7 +3,21 @@ The module describes the console argument parser, which is used to interact
 with the internal component of the program from the outside.
 """
 
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
+
+
+def shard_type(value: str) -> tuple[int, int]:  # Module typing isn't imported on start
+    """
+    Converts the value of the --shard option for the argument parser.
+    """
+
+    from common.utils.shard import parse_shard  # pylint: disable=import-outside-toplevel
+
+    try:
+        return parse_shard(value)
+
+    except ValueError as error:
+        raise ArgumentTypeError(str(error)) from error
 
 
 ARGUMENT_PARSER = ArgumentParser(
@@ -19,7 +33,9 @@ ARGUMENT_PARSER.add_argument(
     help="The absolute path to the input file. "
     "Required format: a pair of files being compared is written "
     "on the i-th line separated by a space. "
-    "Example of a file line: left/path/lh.py right/path/rh.py",
+    "Example of a file line: left/path/lh.py right/path/rh.py. "
+    "Files inside zip and tar archives are written as "
+    "path/bundle.zip::inner/path/lh.py",
 )
 
 ARGUMENT_PARSER.add_argument(
@@ -44,3 +60,257 @@ ARGUMENT_PARSER.add_argument(
     action="store_true",
     help="use percent metric instead of ratio",
 )
+
+ARGUMENT_PARSER.add_argument(
+    "-a",
+    "--alignment",
+    type=str,
+    metavar="PATH",
+    help="write a report with matched regions of each pair to the file. "
+    "The regions are given as line ranges of the original files",
+)
+
+ARGUMENT_PARSER.add_argument(
+    "-w",
+    "--workers",
+    type=int,
+    default=1,
+    metavar="N",
+    help="the number of worker processes to compare files in (default: 1). "
+    "Workers share the formatted files through shared memory",
+)
+
+ARGUMENT_PARSER.add_argument(
+    "-s",
+    "--shard",
+    type=shard_type,
+    metavar="K/N",
+    help="compare only the K-th of N parts of the pairs, split by the "
+    "estimated cost. The i-th line of the output contains the number of "
+    "the input line and its value, use merge.py to combine the shards",
+)
+
+ARGUMENT_PARSER.add_argument(
+    "-m",
+    "--manifest",
+    type=str,
+    metavar="PATH",
+    help="the file with the results of the previous runs. Only the pairs "
+    "where any of the files has changed are compared, and the manifest is "
+    "updated with their results. The file is created if it doesn't exist",
+)
+
+ARGUMENT_PARSER.add_argument(
+    "--sqlite",
+    type=str,
+    metavar="PATH",
+    help="also write the results to the SQLite database: paths, content "
+    "hashes, ratios of both formatting variants, score and time of each "
+    "pair. Each run is added to the database as a new one",
+)
+
+ARGUMENT_PARSER.add_argument(
+    "--all-pairs",
+    action="store_true",
+    help="treat the input file as a zip or tar archive and compare all the "
+    "pairs of Python files inside it. The i-th line of the output contains "
+    "the paths to the files of the i-th pair and their similarity value",
+)
+
+ARGUMENT_PARSER.add_argument(
+    "--prefetch",
+    type=int,
+    default=16,
+    metavar="N",
+    help="the number of files read in background ahead of their parsing "
+    "during the validation (default: 16). Set 0 to read the files one by one",
+)
+
+ARGUMENT_PARSER.add_argument(
+    "--max-pair-seconds",
+    type=float,
+    metavar="SECONDS",
+    help="the time limit of comparing a single pair. The pairs which "
+    "exceed it are handled according to the --budget-fallback option. "
+    "The alignment report is not limited",
+)
+
+ARGUMENT_PARSER.add_argument(
+    "--max-cells",
+    type=int,
+    metavar="N",
+    help="the limit of the size of the Levenshtein distance matrix of a "
+    "single pair. The pairs which exceed it are handled according to the "
+    "--budget-fallback option without counting the distance at all",
+)
+
+ARGUMENT_PARSER.add_argument(
+    "--budget-fallback",
+    choices=["estimate", "skip"],
+    default="estimate",
+    help="what to do with the pairs which exceed their limits: estimate "
+    "the value by the lines both files have, which is marked as "
+    "'approximate' in the output, or write 'skipped' and the reason "
+    "instead of the value (default: estimate)",
+)
+
+ARGUMENT_PARSER.add_argument(
+    "--structural",
+    choices=["off", "report", "filter"],
+    default="off",
+    help="the use of the structural similarity, which compares the hashes "
+    "of all subtrees of the programs in linear time: write it after the "
+    "value as the second score, or also write it instead of the value, "
+    "marked as 'approximate', for the pairs below --structural-threshold "
+    "without counting the Levenshtein distance (default: off)",
+)
+
+ARGUMENT_PARSER.add_argument(
+    "--structural-threshold",
+    type=float,
+    default=0.2,
+    metavar="RATIO",
+    help="the structural similarity below which the pairs are filtered "
+    "out by --structural filter (default: 0.2)",
+)
+
+
+INDEX_ARGUMENT_PARSER = ArgumentParser(
+    prog="python index.py",
+    description="Build the index of the corpus of Python files and find "
+    "the files of the corpus which are most similar to the given one.",
+    epilog="Created by @maseoff",
+)
+
+INDEX_SUBPARSERS = INDEX_ARGUMENT_PARSER.add_subparsers(
+    dest="command",
+    required=True,
+)
+
+INDEX_BUILD_PARSER = INDEX_SUBPARSERS.add_parser(
+    "build",
+    help="add files to the index. The index is created if it doesn't exist",
+)
+
+INDEX_BUILD_PARSER.add_argument(
+    "index",
+    type=str,
+    help="The path to the index file",
+)
+
+INDEX_BUILD_PARSER.add_argument(
+    "files",
+    type=str,
+    nargs="*",
+    help="The paths to the Python files to add",
+)
+
+INDEX_BUILD_PARSER.add_argument(
+    "-l",
+    "--list",
+    type=str,
+    metavar="PATH",
+    help="the file with paths to the Python files to add, one per line",
+)
+
+INDEX_QUERY_PARSER = INDEX_SUBPARSERS.add_parser(
+    "query",
+    help="find the files of the index which are most similar to the given one",
+)
+
+INDEX_QUERY_PARSER.add_argument(
+    "index",
+    type=str,
+    help="The path to the index file",
+)
+
+INDEX_QUERY_PARSER.add_argument(
+    "file",
+    type=str,
+    help="The path to the Python file to look for",
+)
+
+INDEX_QUERY_PARSER.add_argument(
+    "-k",
+    type=int,
+    default=5,
+    help="the number of the most similar files to show (default: 5)",
+)
+
+INDEX_QUERY_PARSER.add_argument(
+    "-p",
+    "--percent",
+    action="store_true",
+    help="use percent metric instead of ratio",
+)
+
+
+SERVE_ARGUMENT_PARSER = ArgumentParser(
+    prog="python serve.py",
+    description="Run the local HTTP server which compares Python files "
+    "and keeps the normalized files in memory between requests.",
+    epilog="Created by @maseoff",
+)
+
+SERVE_ARGUMENT_PARSER.add_argument(
+    "--host",
+    type=str,
+    default="127.0.0.1",
+    help="the address to listen on (default: 127.0.0.1)",
+)
+
+SERVE_ARGUMENT_PARSER.add_argument(
+    "--port",
+    type=int,
+    default=8765,
+    help="the port to listen on (default: 8765)",
+)
+
+SERVE_ARGUMENT_PARSER.add_argument(
+    "--index",
+    type=str,
+    metavar="PATH",
+    help="the corpus index built with index.py to answer queries",
+)
+
+SERVE_ARGUMENT_PARSER.add_argument(
+    "--max-programs",
+    type=int,
+    default=4096,
+    metavar="N",
+    help="the number of normalized files kept in memory, the least "
+    "recently used are dropped first (default: 4096)",
+)
+
+
+MERGE_ARGUMENT_PARSER = ArgumentParser(
+    prog="python merge.py",
+    description="Combine the outputs of the shards produced with the "
+    "--shard option into the output of the whole input file.",
+    epilog="Created by @maseoff",
+)
+
+MERGE_ARGUMENT_PARSER.add_argument(
+    "input",
+    type=str,
+    help="The absolute path to the input file which was split into shards",
+)
+
+MERGE_ARGUMENT_PARSER.add_argument(
+    "--all-pairs",
+    action="store_true",
+    help="the shards compared all the pairs of the input archive",
+)
+
+MERGE_ARGUMENT_PARSER.add_argument(
+    "output",
+    type=str,
+    help="The absolute path to the output file",
+)
+
+MERGE_ARGUMENT_PARSER.add_argument(
+    "shards",
+    type=str,
+    nargs="+",
+    help="The absolute paths to the output files of the shards",
+)
@@ -0,0 +1,436 @@
+"""
+The module describes the pipeline which compares pairs of files. Files
+are identified by the hash of their content, so resubmitted duplicates,
+reversed pairs and repeated pairs are computed only once. A long-living
+pipeline can bound the number of the stored programs and results. Worker
+processes, the corpus arena, the alignment and the structural similarity
+are imported only when they are used, so a single pair is compared
+without them.
+"""
+
+import time
+
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Self, Set, Tuple
+
+from common.objects.cache import LRUDict, NormalizationCache
+
+from common.utils.file import (
+    get_source_signature,
+    read_source,
+)
+from common.utils.metrics import (
+    SHORTCUT_COUNTERS,
+    MetricResult,
+    PairBudget,
+    calculate_metric_result,
+)
+
+if TYPE_CHECKING:
+    from common.objects.arena import CorpusArena
+    from common.objects.manifest import ResultsManifest
+
+    from common.utils.alignment import AlignmentReport
+
+
+WORKER_ARENA: "CorpusArena | None" = None  # The arena of the worker process
+WORKER_BUDGET: PairBudget | None = None  # The budget of the worker process
+
+# How many results are stored per program when the programs are bounded
+RESULTS_PER_PROGRAM = 16
+
+
+class ComparisonPipeline(object):
+    """
+    A class that compares files and memorizes everything
+    which can be reused by the following comparisons.
+    """
+
+    __slots__ = [
+        "_budget",
+        "_cache",
+        "_manifest",
+        "_hashes",
+        "_revalidate",
+        "_results",
+        "_reports",
+        "_precomputed",
+        "_structural",
+        "_structural_ratios",
+        "_structural_threshold",
+        "_variants",
+        "computed",
+        "reused",
+        "restored",
+    ]
+
+    def __init__(
+        self: Self,
+        manifest: "ResultsManifest | None" = None,
+        revalidate: bool = True,
+        budget: PairBudget | None = None,
+        structural: str = "off",
+        structural_threshold: float = 0.0,
+        max_programs: int | None = None,
+        alignment: bool = False
+    ) -> None:
+
+        # Every program usually takes part in several pairs
+        max_results = None if max_programs is None else max_programs * RESULTS_PER_PROGRAM
+
+        self._budget = budget
+        self._cache = NormalizationCache(
+            structural=structural != "off",
+            max_size=max_programs,
+        )
+        self._manifest = manifest
+        self._hashes: Dict[str, Tuple[Tuple[int, int], str]] = LRUDict(max_programs)
+        self._revalidate = revalidate  # Whether files may change between loads
+        self._results: Dict[Tuple[str, str], MetricResult] = LRUDict(max_results)
+        self._reports: Dict[Tuple[str, str], AlignmentReport] = LRUDict(max_results)
+        self._precomputed: Set[Tuple[str, str]] = set()
+        self._structural = structural  # "off", "report" or "filter"
+        self._structural_ratios: Dict[Tuple[str, str], float] = LRUDict(max_results)
+        self._structural_threshold = structural_threshold
+
+        # The formatted variants of the programs, if the pairs are aligned
+        self._variants: Dict[str, Dict[str, Tuple[str, List[int | None]]]] | None = (
+            LRUDict(max_programs) if alignment else None
+        )
+
+        self.computed = 0  # Pairs which required the metric calculation
+        self.reused = 0  # Pairs which were answered without it
+        self.restored = 0  # Pairs which were taken from the manifest
+
+    def load(self: Self, path: str) -> str:
+        """
+        Reads the file if it has not been loaded yet or has been modified
+        since the last loading. When files may change, the file is
+        normalized right away, so the hash of a file which can't be
+        normalized is never remembered, and the program of the previous
+        version of the file is forgotten.
+
+        @param path: The path to the file
+        @return: The hash of the file content
+        """
+
+        if path in self._hashes and not self._revalidate:
+            return self._hashes[path][1]
+
+        signature = get_source_signature(path)
+        if (
+            path in self._hashes
+            and self._hashes[path][0] == signature
+            and self._hashes[path][1] in self._cache
+            and (self._variants is None or self._hashes[path][1] in self._variants)
+        ):
+            return self._hashes[path][1]
+
+        content_hash = self.load_code(read_source(path))
+
+        if path in self._hashes:
+            superseded_hash = self._hashes.pop(path)[1]
+            if superseded_hash != content_hash and all(
+                loaded_hash != superseded_hash for _, loaded_hash in self._hashes.values()
+            ):
+                self._cache.discard(superseded_hash)
+                if self._variants is not None:
+                    self._variants.pop(superseded_hash, None)
+
+        self._hashes[path] = (signature, content_hash)
+        return content_hash
+
+    def load_sources(self: Self, sources: Dict[str, Tuple[Tuple[int, int], str]]) -> None:
+        """
+        Loads the files which have been already read, e.g. by the validator,
+        so they are not read again.
+
+        @param sources: The signatures and contents of the files by their paths
+        """
+
+        for path, (signature, code) in sources.items():
+            self._hashes[path] = (signature, self.load_code(code))
+
+    def load_code(self: Self, code: str) -> str:
+        """
+        Remembers the code to normalize it when it is needed. When files
+        may change, the pipeline is long-living, so the code is normalized
+        right away and only the bounded cache of the programs keeps it.
+        If the pairs are aligned, the code is formatted for the alignment
+        right away, so the files are never read again.
+
+        @param code: Python code to load
+        @return: The hash of the code content
+        """
+
+        content_hash = self._cache.add(code)
+        if self._revalidate:
+            self._cache.get(content_hash)
+
+        if self._variants is not None and content_hash not in self._variants:
+            from common.utils.alignment import format_variants  # pylint: disable=import-outside-toplevel
+
+            self._variants[content_hash] = format_variants(code)
+
+        return content_hash
+
+    def compare(self: Self, lh_path: str, rh_path: str) -> float:
+        """
+        Calculates the similarity ratio between two files.
+
+        @param lh_path: The path to the left-hand file
+        @param rh_path: The path to the right-hand file
+        @return: The similarity ratio
+        """
+
+        return self.compare_loaded(self.load(lh_path), self.load(rh_path)).ratio
+
+    def compare_loaded(self: Self, lh_hash: str, rh_hash: str) -> MetricResult:
+        """
+        Calculates the similarity metric between two loaded programs.
+
+        @param lh_hash: The content hash of the left-hand program
+        @param rh_hash: The content hash of the right-hand program
+        @return: The detailed result of the metric
+        """
+
+        key = get_pair_key(lh_hash, rh_hash)
+        if key in self._precomputed:
+            self._precomputed.remove(key)
+            self.computed += 1
+            result = self._results[key]
+
+        elif key in self._results:
+            self.reused += 1
+            return self._results[key]
+
+        elif key[0] == key[1]:
+            self.reused += 1
+            result = MetricResult(ratio=1.0, unsorted_ratio=1.0, sorted_ratio=1.0, seconds=0.0)
+
+        elif self._manifest is not None and key in self._manifest:
+            self.restored += 1
+            result = self._manifest.get(key)
+
+        elif self.is_filtered(key):
+            self.computed += 1
+            SHORTCUT_COUNTERS["filtered_by_structure"] += 1
+
+            started_at = time.perf_counter()
+            structural_ratio = self.get_structural_ratio(key)
+
+            result = MetricResult(
+                ratio=structural_ratio,
+                unsorted_ratio=None,
+                sorted_ratio=None,
+                seconds=time.perf_counter() - started_at,
+                status="approximate",
+                reason=f"the structural similarity is below {self._structural_threshold}",
+            )
+
+        else:
+            self.computed += 1
+            result = calculate_metric_result(
+                lh_code=self._cache.get(key[0]),
+                rh_code=self._cache.get(key[1]),
+                budget=self._budget,
+            )
+
+            if self._manifest is not None and result.status == "exact":
+                self._manifest.set(key, result)
+
+        if self._structural != "off" and result.structural_ratio is None:
+            result = result._replace(structural_ratio=self.get_structural_ratio(key))
+
+        self._results[key] = result
+        return result
+
+    def get_structural_ratio(self: Self, key: Tuple[str, str]) -> float:
+        """
+        Calculates the structural similarity of the pair of loaded programs.
+
+        @param key: The key of the pair
+        @return: The structural similarity ratio
+        """
+
+        if key[0] == key[1]:
+            return 1.0
+
+        if key not in self._structural_ratios:
+            from common.utils.structure import calculate_structural_similarity  # pylint: disable=import-outside-toplevel
+
+            self._structural_ratios[key] = calculate_structural_similarity(
+                self._cache.get_structure(key[0]),
+                self._cache.get_structure(key[1]),
+            )
+
+        return self._structural_ratios[key]
+
+    def is_filtered(self: Self, key: Tuple[str, str]) -> bool:
+        """
+        Checks whether the pair is filtered out by its structural similarity,
+        so the Levenshtein distance is not counted for it.
+
+        @param key: The key of the pair
+        @return: Whether the pair is filtered out
+        """
+
+        return (
+            self._structural == "filter"
+            and self.get_structural_ratio(key) < self._structural_threshold
+        )
+
+    def compute_in_parallel(
+        self: Self,
+        pairs: Iterable[Tuple[str, str]],
+        workers: int
+    ) -> Iterator[Tuple[int, int]]:
+
+        """
+        Calculates the ratios of the pairs in worker processes, so the
+        following `compare` calls only take them from the memory. The
+        normalized programs are shared with the workers through the
+        corpus arena, and each task is a pair of program IDs.
+
+        @param pairs: Pairs of paths to the files, which are already loaded
+        @param workers: The number of worker processes
+        @return: The iterator over the numbers of done and total tasks
+        """
+
+        from multiprocessing import Pool  # pylint: disable=import-outside-toplevel
+        from common.objects.arena import CorpusArena  # pylint: disable=import-outside-toplevel
+
+        keys = sorted({
+            get_pair_key(self.load(lh_path), self.load(rh_path))
+            for lh_path, rh_path in pairs
+        } - self._results.keys())
+
+        keys = [
+            key for key in keys
+            if key[0] != key[1]
+            and (self._manifest is None or key not in self._manifest)
+            and not self.is_filtered(key)
+        ]
+
+        hashes = sorted({content_hash for key in keys for content_hash in key})
+        program_ids = {content_hash: number for number, content_hash in enumerate(hashes)}
+        tasks = [(program_ids[key[0]], program_ids[key[1]]) for key in keys]
+
+        yield 0, len(tasks)
+
+        arena = CorpusArena.create([self._cache.get(content_hash) for content_hash in hashes])
+        try:
+            with Pool(
+                processes=workers,
+                initializer=init_worker,
+                initargs=(arena.name, self._budget),
+            ) as pool:
+                results = pool.imap_unordered(
+                    compute_task,
+                    tasks,
+                    chunksize=max(1, len(tasks) // (workers * 16)),
+                )
+
+                for done, (lh_id, rh_id, result, shortcuts) in enumerate(results, start=1):
+                    key = (hashes[lh_id], hashes[rh_id])
+                    self._results[key] = result
+                    self._precomputed.add(key)
+
+                    if self._manifest is not None and result.status == "exact":
+                        self._manifest.set(key, result)
+
+                    SHORTCUT_COUNTERS.update(shortcuts)
+
+                    yield done, len(tasks)
+
+        finally:
+            arena.close()
+
+    def align(self: Self, lh_path: str, rh_path: str) -> "AlignmentReport":
+        """
+        Builds the alignment report for two files. The spans of the report
+        are always given in the order of the passed files. The pipeline must
+        be created with `alignment=True`.
+
+        @param lh_path: The path to the left-hand file
+        @param rh_path: The path to the right-hand file
+        @return: The alignment report
+        """
+
+        lh_hash = self.load(lh_path)
+        rh_hash = self.load(rh_path)
+
+        if (lh_hash, rh_hash) in self._reports:
+            self.reused += 1
+            return self._reports[(lh_hash, rh_hash)]
+
+        if (rh_hash, lh_hash) in self._reports:
+            self.reused += 1
+            report = self._reports[(rh_hash, lh_hash)]
+
+            return report._replace(spans=[
+                span._replace(
+                    lh_first_line=span.rh_first_line,
+                    lh_last_line=span.rh_last_line,
+                    rh_first_line=span.lh_first_line,
+                    rh_last_line=span.lh_last_line,
+                )
+                for span in report.spans
+            ])
+
+        self.computed += 1
+        from common.utils.alignment import calculate_alignment  # pylint: disable=import-outside-toplevel
+
+        report = calculate_alignment(self._variants[lh_hash], self._variants[rh_hash])
+
+        self._reports[(lh_hash, rh_hash)] = report
+        self._results[get_pair_key(lh_hash, rh_hash)] = MetricResult(
+            ratio=report.ratio,
+            unsorted_ratio=None,
+            sorted_ratio=None,
+            seconds=report.seconds,
+        )
+
+        return report
+
+
+def get_pair_key(lh_hash: str, rh_hash: str) -> Tuple[str, str]:
+    """
+    Returns the key of the unordered pair of files.
+    """
+
+    return (lh_hash, rh_hash) if lh_hash <= rh_hash else (rh_hash, lh_hash)
+
+
+def init_worker(arena_name: str, budget: PairBudget | None) -> None:
+    """
+    Attaches the worker process to the corpus arena.
+    """
+
+    from common.objects.arena import CorpusArena  # pylint: disable=import-outside-toplevel
+
+    global WORKER_ARENA, WORKER_BUDGET  # pylint: disable=global-statement
+    WORKER_ARENA = CorpusArena.attach(arena_name)
+    WORKER_BUDGET = budget
+
+
+def compute_task(task: Tuple[int, int]) -> Tuple[int, int, MetricResult, List[str]]:
+    """
+    Calculates the metric of the pair of programs in the worker process.
+
+    @param task: IDs of the programs in the corpus arena
+    @return: IDs of the programs, the result and the used metric shortcuts
+    """
+
+    lh_id, rh_id = task
+    counters = dict(SHORTCUT_COUNTERS)
+
+    result = calculate_metric_result(
+        lh_code=WORKER_ARENA.get(lh_id),
+        rh_code=WORKER_ARENA.get(rh_id),
+        budget=WORKER_BUDGET,
+    )
+    shortcuts = [
+        name for name, count in SHORTCUT_COUNTERS.items() if count != counters[name]
+    ]
+
+    return lh_id, rh_id, result, shortcuts
@@ -0,0 +1,211 @@
+"""
+The module describes the local HTTP server which answers comparison
+requests. The server lives as long as it is needed, so the normalized
+programs and the corpus index stay in memory between the requests.
+
+Every endpoint accepts a JSON object in the body of a POST request:
+
+- /compare: {"lh": path, "rh": path} or {"lh_code": code, "rh_code": code}
+- /batch: {"pairs": [[path, path], ...]}
+- /query: {"file": path, "k": 5}, requires the corpus index
+
+Each of them accepts the optional "percent" flag. GET /stats returns
+the counters of the server.
+"""
+
+import json
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Self, Tuple
+
+from common.objects.index import CorpusIndex
+from common.objects.pipeline import ComparisonPipeline
+
+from common.utils.file import read_source
+from common.utils.metrics import get_shortcut_counters
+
+
+class ComparisonServer(HTTPServer):
+    """
+    Descendant of the HTTPServer class, which holds the warm state.
+    Requests are handled one by one, since the work is CPU-bound.
+    """
+
+    def __init__(
+        self: Self,
+        address: Tuple[str, int],
+        index: CorpusIndex | None = None,
+        max_programs: int | None = None
+    ) -> None:
+
+        super().__init__(address, ComparisonRequestHandler)
+
+        self.pipeline = ComparisonPipeline(max_programs=max_programs)
+        self.index = index
+
+
+class ComparisonRequestHandler(BaseHTTPRequestHandler):
+    """
+    Descendant of the BaseHTTPRequestHandler class,
+    designed to answer the comparison requests.
+    """
+
+    server: ComparisonServer
+
+    def do_GET(self: Self) -> None:  # pylint: disable=invalid-name
+        """
+        Answers the GET requests.
+        """
+
+        if self.path != "/stats":
+            self.send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+
+        self.send_json(200, {
+            "computed": self.server.pipeline.computed,
+            "reused": self.server.pipeline.reused,
+            "shortcuts": get_shortcut_counters(),
+        })
+
+    def do_POST(self: Self) -> None:  # pylint: disable=invalid-name
+        """
+        Answers the POST requests.
+        """
+
+        handlers = {
+            "/compare": self.handle_compare,
+            "/batch": self.handle_batch,
+            "/query": self.handle_query,
+        }
+
+        if self.path not in handlers:
+            self.send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise TypeError("The body of the request must be a JSON object.")
+
+            response = handlers[self.path](request)
+
+        except (
+            OSError,
+            SyntaxError,
+            ValueError,
+            KeyError,
+            TypeError,
+        ) as error:
+            self.send_json(400, {"error": f"{type(error).__name__}: {error}"})
+            return
+
+        self.send_json(200, response)
+
+    def handle_compare(self: Self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compares a pair of files or a pair of programs.
+        """
+
+        pipeline = self.server.pipeline
+
+        if "lh_code" in request or "rh_code" in request:
+            ratio = pipeline.compare_loaded(
+                pipeline.load_code(get_string(request, "lh_code")),
+                pipeline.load_code(get_string(request, "rh_code")),
+            ).ratio
+
+        else:
+            ratio = pipeline.compare(get_string(request, "lh"), get_string(request, "rh"))
+
+        return {"score": get_score(ratio, request)}
+
+    def handle_batch(self: Self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compares many pairs of files.
+        """
+
+        return {
+            "scores": [
+                get_score(self.server.pipeline.compare(*pair), request)
+                for pair in get_path_pairs(request)
+            ]
+        }
+
+    def handle_query(self: Self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Finds the files of the corpus index most similar to the given one.
+        """
+
+        if self.server.index is None:
+            raise ValueError("The server was started without the corpus index.")
+
+        path = get_string(request, "file")
+        results = self.server.index.query(
+            code=read_source(path),
+            k=int(request.get("k", 5)),
+            exclude=path,
+        )
+
+        return {
+            "results": [
+                {"path": path, "score": get_score(ratio, request)}
+                for path, ratio in results
+            ]
+        }
+
+    def send_json(self: Self, status: int, body: Dict[str, Any]) -> None:
+        """
+        Sends the JSON response.
+        """
+
+        data = json.dumps(body).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self: Self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        """
+        Keeps the console clean: requests are not logged.
+        """
+
+
+def get_score(ratio: float, request: Dict[str, Any]) -> float:
+    """
+    Converts the ratio to the score requested by the client.
+    """
+
+    return ratio * 100 if request.get("percent", False) else ratio
+
+
+def get_string(request: Dict[str, Any], key: str) -> str:
+    """
+    Returns the string value of the request, so a value of another type
+    is answered with 400 instead of failing deep in the comparison.
+    """
+
+    value = request[key]
+    if not isinstance(value, str):
+        raise TypeError(f"The value of \"{key}\" must be a string.")
+
+    return value
+
+
+def get_path_pairs(request: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Returns the pairs of paths of the batch request.
+    """
+
+    pairs = request["pairs"]
+    if not isinstance(pairs, list) or not all(
+        isinstance(pair, list)
+        and len(pair) == 2
+        and all(isinstance(path, str) for path in pair)
+        for pair in pairs
+    ):
+        raise TypeError("The value of \"pairs\" must be a list of pairs of strings.")
+
+    return [(lh_path, rh_path) for lh_path, rh_path in pairs]
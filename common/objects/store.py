@@ -0,0 +1,182 @@
+"""
+The module describes the SQLite store of the results. Unlike the output
+file, the store keeps the paths, the content hashes and the details of
+every compared pair, and it is indexed, so questions like "all the pairs
+of the given file with a score above 0.85" are answered without parsing
+text files. Rows are written in batches to not slow down the comparison.
+"""
+
+import sqlite3
+
+from datetime import datetime, timezone
+from typing import List, Self, Tuple
+
+from common.utils.metrics import METRIC_VERSION, MetricResult
+
+
+BATCH_SIZE = 1000
+
+# PRAGMA user_version of the schema, so newer schemas are recognized
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    input TEXT NOT NULL,
+    metric_version INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS scores (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    lineno INTEGER NOT NULL,
+    lh_path TEXT NOT NULL,
+    rh_path TEXT NOT NULL,
+    lh_hash TEXT NOT NULL,
+    rh_hash TEXT NOT NULL,
+    unsorted_ratio REAL,
+    sorted_ratio REAL,
+    score REAL,
+    seconds REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'exact',
+    reason TEXT,
+    structural_ratio REAL
+);
+
+CREATE INDEX IF NOT EXISTS scores_run ON scores (run_id, lineno);
+CREATE INDEX IF NOT EXISTS scores_lh_path ON scores (lh_path, score);
+CREATE INDEX IF NOT EXISTS scores_rh_path ON scores (rh_path, score);
+CREATE INDEX IF NOT EXISTS scores_lh_hash ON scores (lh_hash);
+CREATE INDEX IF NOT EXISTS scores_rh_hash ON scores (rh_hash);
+CREATE INDEX IF NOT EXISTS scores_score ON scores (score);
+"""
+
+COLUMNS = [
+    "run_id",
+    "lineno",
+    "lh_path",
+    "rh_path",
+    "lh_hash",
+    "rh_hash",
+    "unsorted_ratio",
+    "sorted_ratio",
+    "score",
+    "seconds",
+    "status",
+    "reason",
+    "structural_ratio",
+]
+
+
+class ResultsStore(object):
+    """
+    A class that writes the results of a run to the SQLite database.
+    The score is always written as a ratio, even if percents are used,
+    and it is NULL for the skipped pairs.
+    """
+
+    __slots__ = [
+        "_connection",
+        "_run_id",
+        "_rows",
+    ]
+
+    def __init__(self: Self, path: str, input_path: str) -> None:
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+
+        self.create_schema()
+
+        with self._connection:
+            self._run_id = self._connection.execute(
+                "INSERT INTO runs (started_at, input, metric_version) VALUES (?, ?, ?)",
+                (datetime.now(timezone.utc).isoformat(), input_path, METRIC_VERSION),
+            ).lastrowid
+
+        self._rows: List[Tuple] = []
+
+    def create_schema(self: Self) -> None:
+        """
+        Creates the schema if the database is new. A database of a newer
+        schema is not written to.
+        """
+
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            self._connection.close()
+            raise ValueError(
+                f"The database has schema version {version}, but version "
+                f"{SCHEMA_VERSION} or older is required."
+            )
+
+        self._connection.execute("BEGIN")
+        with self._connection:
+            for statement in SCHEMA.split(";"):
+                self._connection.execute(statement)
+
+            self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @property
+    def run_id(self: Self) -> int:
+        """
+        The ID of the run the results are written to.
+        """
+
+        return self._run_id
+
+    def add(
+        self: Self,
+        lineno: int,
+        paths: Tuple[str, str],
+        hashes: Tuple[str, str],
+        result: MetricResult,
+    ) -> None:
+
+        """
+        Adds the result of the pair to the current batch.
+
+        @param lineno: The number of the line of the input file
+        @param paths: The paths to the left-hand and right-hand files
+        @param hashes: The content hashes of the left-hand and right-hand files
+        @param result: The detailed result of the metric
+        """
+
+        self._rows.append((
+            self._run_id,
+            lineno,
+            *paths,
+            *hashes,
+            result.unsorted_ratio,
+            result.sorted_ratio,
+            result.ratio,
+            result.seconds,
+            result.status,
+            result.reason,
+            result.structural_ratio,
+        ))
+
+        if len(self._rows) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self: Self) -> None:
+        """
+        Writes the current batch in a single transaction.
+        """
+
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT INTO scores ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                self._rows,
+            )
+
+        self._rows = []
+
+    def close(self: Self) -> None:
+        """
+        Writes the rest of the results and closes the database.
+        """
+
+        self.flush()
+        self._connection.close()
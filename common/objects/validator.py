@@ -11,10 +11,19 @@ import os
 import sys
 
 from argparse import Namespace
-from typing import List, Self
+from typing import Collection, Dict, Iterable, Iterator, List, Self, Tuple
 
 import common.utils.stdout as stdout
 
+from common.objects.archive import ARCHIVE_READER
+from common.utils.file import (
+    get_archive_path,
+    read_pairs,
+    read_source_with_signature,
+    sort_by_read_order,
+    source_exists,
+)
+
 
 class ArgumentValidator(object):
     """
@@ -25,11 +34,15 @@ class ArgumentValidator(object):
     __slots__ = [
         "_args",
         "_errors",
+        "_pairs",
+        "_sources",
     ]
 
     def __init__(self: Self) -> None:
         self._args: Namespace | None = None
         self._errors: List[str] | None = None
+        self._pairs: Collection[Tuple[int, Tuple[str, str] | None]] = []
+        self._sources: Dict[str, Tuple[Tuple[int, int], str]] = {}
 
     def validate_args(self: Self, args: Namespace) -> None:
         """
@@ -38,14 +51,102 @@ class ArgumentValidator(object):
 
         self._args = args
         self._errors = []
+        self._pairs = []
+        self._sources = {}
 
         stdout.message(title="VALIDATION", msg="Starting validation.")
 
         self.__validate_input()
         self.__validate_output()
+        self.__validate_options()
 
         self.__get_validation_status()
 
+    def take_pairs(self: Self) -> Collection[Tuple[int, Tuple[str, str] | None]]:
+        """
+        Returns the pairs to compare, which are selected during the
+        validation, and forgets them. Each pair goes with its line, blank
+        lines of the input file and the pairs of other shards are None.
+        The pairs of an archive are not listed, but iterated lazily.
+
+        @return: The lines and the pairs of paths to the files
+        """
+
+        pairs, self._pairs = self._pairs, []
+        return pairs
+
+    def take_sources(self: Self) -> Dict[str, Tuple[Tuple[int, int], str]]:
+        """
+        Returns the files read during the validation, so they are not read
+        again, and forgets them.
+
+        @return: The signatures and contents of the files by their paths
+        """
+
+        sources, self._sources = self._sources, {}
+        return sources
+
+    def __read_sources(
+        self: Self,
+        paths: List[str]
+    ) -> Iterator[Tuple[str, Tuple[Tuple[int, int], str]]]:
+
+        """
+        Reads the files in the given order. If prefetching is enabled, the
+        files are read by background threads, which hides the latency of
+        network storage. A single pair has nothing to overlap the reading
+        with, so threads are not started for it.
+        """
+
+        if self._args.prefetch > 0 and len(paths) > 2:
+            from common.utils.prefetch import prefetch  # pylint: disable=import-outside-toplevel
+
+            return prefetch(
+                paths,
+                read_source_with_signature,
+                self._args.prefetch,
+                key=get_archive_path,
+            )
+
+        return ((path, read_source_with_signature(path)) for path in paths)
+
+    def __select_pairs(self: Self, pairs: List[Tuple[str, str] | None]) -> List[str]:
+        """
+        Keeps the pairs of the shard of this run. The shards are assigned
+        before the files are read, so only the files of the shard are read.
+
+        @param pairs: Pairs of paths, None for blank lines
+        @return: The paths used by the pairs of the shard
+        """
+
+        from common.utils.shard import select_shard  # pylint: disable=import-outside-toplevel
+
+        self._pairs = list(enumerate(select_shard(pairs, self._args.shard), start=1))
+        return list(dict.fromkeys(
+            path for _, pair in self._pairs if pair is not None for path in pair
+        ))
+
+    def __parse_sources(self: Self, paths: Iterable[str]) -> List[str]:
+        """
+        Reads and parses the files, keeping the contents of the valid ones.
+
+        @param paths: The paths to the files in the order of reading
+        @return: The paths to the files with syntax errors
+        """
+
+        invalid_paths = []
+        for path, (signature, code) in self.__read_sources(list(paths)):
+            try:
+                ast.parse(code)
+
+            except SyntaxError:
+                invalid_paths.append(path)
+                continue
+
+            self._sources[path] = (signature, code)
+
+        return invalid_paths
+
     def __validate_input(self: Self) -> None:
         """
         Validates the input file.
@@ -60,6 +161,10 @@ class ArgumentValidator(object):
             return
 
         stdout.progress_bar(current=25, total=100, title="VALIDATION")
+        if self._args.all_pairs:
+            self.__validate_input_archive()
+            return
+
         if not self.__is_valid_input_format():
             self._errors.append(
                 "The input file does not adhere to the required format. It is "
@@ -104,8 +209,12 @@ class ArgumentValidator(object):
         """
         Validates the input files which are required to be compared.
         Expected that the input files exists and follows the format.
+        Every file is checked only once, even if it is used in many pairs,
+        and the files are parsed in the order of reading, so members of
+        archives are never read backwards.
         """
 
+        linenos = {}  # The first line of each path
         with open(
             file=self._args.input,
             mode="r",
@@ -113,44 +222,70 @@ class ArgumentValidator(object):
         ) as input_file:
 
             for lineno, line in enumerate(input_file, start=1):
-                stripped_line = line.strip()
+                for path in line.split():
+                    linenos.setdefault(path, lineno)
+
+        existing_paths = []
+        for path, lineno in linenos.items():
+            if not re.match(r".+.py", path):
+                self._errors.append(
+                    f"Line {lineno} of the input file has a wrong "
+                    "file: doesn't have .py extension. Please change "
+                    "the extension or delete the following path from "
+                    f"the input file: {path}"
+                )
+                continue
+
+            if not source_exists(path):
+                self._errors.append(
+                    f"Line {lineno} of the input file has a path that "
+                    "does not exist. Please check if the provided "
+                    f"path is correct and try again: {path}"
+                )
+                continue
+
+            existing_paths.append(path)
+
+        # The sizes of the files are needed to assign the shards
+        if not self._errors:
+            existing_paths = self.__select_pairs(read_pairs(self._args.input))
+
+        # Check if the files have valid Python code
+        for path in self.__parse_sources(sort_by_read_order(existing_paths)):
+            self._errors.append(
+                f"Line {linenos[path]} of the input file has a Python "
+                "file with syntax errors. Please fix the problem "
+                f"or avoid comparing the following one: {path}"
+            )
 
-                if not stripped_line:
-                    continue  # Skip blank lines
+    def __validate_input_archive(self: Self) -> None:
+        """
+        Validates the input archive when all its pairs are compared.
+        Expected that the input file exists.
+        """
+
+        if not ARCHIVE_READER.is_archive(self._args.input):
+            self._errors.append(
+                "The input file is neither a zip nor a tar archive, but all "
+                "the pairs of the archive are required to be compared."
+            )
+            return
 
-                for path in stripped_line.split():
-                    if not re.match(r".+.py", path):
-                        self._errors.append(
-                            f"Line {lineno} of the input file has a wrong "
-                            "file: doesn't have .py extension. Please change "
-                            "the extension or delete the following path from "
-                            f"the input file: {path}"
-                        )
-                        continue
-
-                    if not os.path.exists(path):
-                        self._errors.append(
-                            f"Line {lineno} of the input file has a path that "
-                            "does not exist. Please check if the provided "
-                            f"path is correct and try again: {path}"
-                        )
-                        continue
-
-                    # Check if the file has valid Python code
-                    try:
-                        with open(
-                            file=path,
-                            mode="r",
-                            encoding="utf-8"
-                        ) as file:
-                            ast.parse(file.read())
-
-                    except SyntaxError:
-                        self._errors.append(
-                            f"Line {lineno} of the input file has a Python "
-                            "file with syntax errors. Please fix the problem "
-                            f"or avoid comparing the following one: {path}"
-                        )
+        from common.utils.shard import ArchiveShard  # pylint: disable=import-outside-toplevel
+
+        stdout.progress_bar(current=50, total=100, title="VALIDATION")
+
+        # The pairs are iterated lazily, only the members are listed
+        self._pairs = ArchiveShard(
+            ARCHIVE_READER.list_members(self._args.input),
+            self._args.shard,
+        )
+        for path in self.__parse_sources(self._pairs.get_members()):
+            self._errors.append(
+                "The input archive has a Python file with syntax errors. "
+                "Please fix the problem or remove the following one "
+                f"from the archive: {path}"
+            )
 
     def __validate_output(self: Self) -> None:
         """
@@ -165,6 +300,59 @@ class ArgumentValidator(object):
                 "the past data will be permanently erased."
             )
 
+        if (
+            self._args.alignment is not None
+            and os.path.exists(self._args.alignment)
+            and not self._args.force
+        ):
+            self._errors.append(
+                "The alignment report already exists at the specified path. "
+                "Set the -f or --force flag to use this file. Please note that "
+                "the past data will be permanently erased."
+            )
+
+    def __validate_options(self: Self) -> None:
+        """
+        Validates the options which don't refer to files.
+        """
+
+        if self._args.workers < 1:
+            self._errors.append(
+                "The number of workers must be a positive integer. "
+                f"Please check the provided value: {self._args.workers}"
+            )
+
+        if self._args.prefetch < 0:
+            self._errors.append(
+                "The number of prefetched files can't be negative. "
+                f"Please check the provided value: {self._args.prefetch}"
+            )
+
+        if self._args.max_pair_seconds is not None and self._args.max_pair_seconds <= 0:
+            self._errors.append(
+                "The time limit of a pair must be positive. "
+                f"Please check the provided value: {self._args.max_pair_seconds}"
+            )
+
+        if self._args.max_cells is not None and self._args.max_cells <= 0:
+            self._errors.append(
+                "The limit of the distance matrix size must be positive. "
+                f"Please check the provided value: {self._args.max_cells}"
+            )
+
+        if not 0 <= self._args.structural_threshold <= 1:
+            self._errors.append(
+                "The structural threshold must be between 0 and 1. "
+                f"Please check the provided value: {self._args.structural_threshold}"
+            )
+
+        if self._args.alignment is not None and self._args.structural == "filter":
+            self._errors.append(
+                "The pairs can't be filtered by their structural similarity when "
+                "they are aligned, because the alignment always counts the full "
+                "distance. Please use --structural report or remove -a."
+            )
+
     def __get_validation_status(self: Self) -> None:
         """
         Checks validation status. If any errors were encountered,
@@ -0,0 +1,365 @@
+"""
+The module is responsible for building alignments between two programs.
+Unlike the `levenshtein` function, which only counts the distance, it
+restores which parts of the programs were matched. Hirschberg's algorithm
+is used to keep the memory linear in the length of the shorter string.
+"""
+
+import time
+
+from bisect import bisect_right
+from typing import Dict, List, NamedTuple, Tuple
+
+from common.utils.format import pyformat_with_line_map
+
+
+MIN_SPAN_CHARS = 10  # Shorter spans are considered to be a noise
+
+# The formatting variants and whether they sort functions and classes
+VARIANTS = [("unsorted", False), ("sorted", True)]
+
+
+class MatchedSpan(NamedTuple):
+    """
+    A region of the original sources which was matched during alignment.
+    Line numbers are 1-based and inclusive.
+    """
+
+    lh_first_line: int
+    lh_last_line: int
+    rh_first_line: int
+    rh_last_line: int
+    chars: int
+
+
+class AlignmentReport(NamedTuple):
+    """
+    The result of aligning two programs: the similarity ratio, the name
+    of the formatting variant that gave it, the matched regions and the
+    time spent on the alignment.
+    """
+
+    ratio: float
+    variant: str
+    spans: List[MatchedSpan]
+    seconds: float
+
+
+def format_variants(code: str) -> Dict[str, Tuple[str, List[int | None]]]:
+    """
+    Formats the code in all the variants which are aligned. A program takes
+    part in several pairs, so it is formatted once and the variants are kept.
+
+    @param code: Python code to format
+    @return: The formatted code and its line map by the name of the variant
+    """
+
+    return {
+        variant: pyformat_with_line_map(code, sort_structures)
+        for variant, sort_structures in VARIANTS
+    }
+
+
+def calculate_alignment(
+    lh_variants: Dict[str, Tuple[str, List[int | None]]],
+    rh_variants: Dict[str, Tuple[str, List[int | None]]]
+) -> AlignmentReport:
+
+    """
+    Calculates the similarity ratio in the same way as `calculate_metric`
+    does and aligns the formatting variant which gave the ratio.
+
+    @param lh_variants: left-hand code formatted by `format_variants`
+    @param rh_variants: right-hand code formatted by `format_variants`
+    @return: The alignment report
+    """
+
+    started_at = time.perf_counter()
+
+    best = None
+    for variant, _ in VARIANTS:
+        lh_str, lh_line_map = lh_variants[variant]
+        rh_str, rh_line_map = rh_variants[variant]
+
+        ratio = get_linear_similarity_ratio(lh_str, rh_str)
+        if best is None or ratio > best[0]:
+            best = (ratio, variant, lh_str, rh_str, lh_line_map, rh_line_map)
+
+    ratio, variant, lh_str, rh_str, lh_line_map, rh_line_map = best
+    spans = map_blocks_to_lines(
+        blocks=hirschberg(lh_str, rh_str),
+        lh_str=lh_str,
+        rh_str=rh_str,
+        lh_line_map=lh_line_map,
+        rh_line_map=rh_line_map,
+    )
+
+    return AlignmentReport(
+        ratio=ratio,
+        variant=variant,
+        spans=spans,
+        seconds=time.perf_counter() - started_at,
+    )
+
+
+def get_linear_similarity_ratio(lh_str: str, rh_str: str) -> float:
+    """
+    Calculates the similarity ratio in the same way as `get_similarity_ratio`
+    does, but keeps only two rows of the distance matrix, which go along
+    the shorter string.
+
+    @param lh_str: left-hand string
+    @param rh_str: right-hand string
+    @return: The similarity ratio
+    """
+
+    # The levenshtein function returns 0 if any of the strings is empty
+    if not lh_str or not rh_str:
+        return 1.0
+
+    if len(lh_str) < len(rh_str):
+        lh_str, rh_str = rh_str, lh_str
+
+    distance = forward_row(lh_str, 0, len(lh_str), rh_str, 0, len(rh_str))[-1]
+    return 1 - distance / len(lh_str)
+
+
+def hirschberg(lh_str: str, rh_str: str) -> List[Tuple[int, int, int]]:
+    """
+    Finds an optimal Levenshtein alignment of the two strings using
+    Hirschberg's algorithm. Only two rows of the distance matrix are
+    kept at a time, and the rows go along the shorter string.
+
+    @param lh_str: left-hand string
+    @param rh_str: right-hand string
+    @return: Matched blocks as (lh_start, rh_start, size) triples
+    """
+
+    swapped = len(lh_str) < len(rh_str)
+    if swapped:
+        lh_str, rh_str = rh_str, lh_str
+
+    pairs: List[Tuple[int, int]] = []
+    align_ranges(lh_str, 0, len(lh_str), rh_str, 0, len(rh_str), pairs)
+
+    if swapped:
+        pairs = [(rh_index, lh_index) for lh_index, rh_index in pairs]
+
+    return collect_blocks(pairs)
+
+
+def align_ranges(
+    lh_str: str, lh_lo: int, lh_hi: int,
+    rh_str: str, rh_lo: int, rh_hi: int,
+    pairs: List[Tuple[int, int]],
+) -> None:
+
+    """
+    Aligns `lh_str[lh_lo:lh_hi]` with `rh_str[rh_lo:rh_hi]` and appends
+    the matched index pairs to `pairs` in increasing order.
+    """
+
+    # Common prefixes and suffixes are always a part of an optimal alignment
+    while lh_lo < lh_hi and rh_lo < rh_hi and lh_str[lh_lo] == rh_str[rh_lo]:
+        pairs.append((lh_lo, rh_lo))
+        lh_lo += 1
+        rh_lo += 1
+
+    suffix: List[Tuple[int, int]] = []
+    while lh_lo < lh_hi and rh_lo < rh_hi and lh_str[lh_hi - 1] == rh_str[rh_hi - 1]:
+        lh_hi -= 1
+        rh_hi -= 1
+        suffix.append((lh_hi, rh_hi))
+
+    if lh_lo == lh_hi or rh_lo == rh_hi:
+        pass
+
+    elif lh_hi - lh_lo == 1:
+        symbol = lh_str[lh_lo]
+        for rh_index in range(rh_lo, rh_hi):
+            if rh_str[rh_index] == symbol:
+                pairs.append((lh_lo, rh_index))
+                break
+
+    elif rh_hi - rh_lo == 1:
+        symbol = rh_str[rh_lo]
+        for lh_index in range(lh_lo, lh_hi):
+            if lh_str[lh_index] == symbol:
+                pairs.append((lh_index, rh_lo))
+                break
+
+    else:
+        lh_mid = (lh_lo + lh_hi) // 2
+        forward = forward_row(lh_str, lh_lo, lh_mid, rh_str, rh_lo, rh_hi)
+        backward = backward_row(lh_str, lh_mid, lh_hi, rh_str, rh_lo, rh_hi)
+
+        width = rh_hi - rh_lo
+        split = min(
+            range(width + 1),
+            key=lambda col: forward[col] + backward[width - col],
+        )
+
+        align_ranges(lh_str, lh_lo, lh_mid, rh_str, rh_lo, rh_lo + split, pairs)
+        align_ranges(lh_str, lh_mid, lh_hi, rh_str, rh_lo + split, rh_hi, pairs)
+
+    pairs.extend(reversed(suffix))
+
+
+def forward_row(
+    lh_str: str, lh_lo: int, lh_hi: int,
+    rh_str: str, rh_lo: int, rh_hi: int,
+) -> List[int]:
+
+    """
+    Returns the last row of the distance matrix between
+    `lh_str[lh_lo:lh_hi]` and every prefix of `rh_str[rh_lo:rh_hi]`.
+    """
+
+    previous = list(range(rh_hi - rh_lo + 1))
+    for lh_index in range(lh_lo, lh_hi):
+        lh_symbol = lh_str[lh_index]
+        current = [previous[0] + 1]
+
+        for col, rh_index in enumerate(range(rh_lo, rh_hi)):
+            substitution = previous[col] + (lh_symbol != rh_str[rh_index])
+            current.append(min(substitution, previous[col + 1] + 1, current[col] + 1))
+
+        previous = current
+
+    return previous
+
+
+def backward_row(
+    lh_str: str, lh_lo: int, lh_hi: int,
+    rh_str: str, rh_lo: int, rh_hi: int,
+) -> List[int]:
+
+    """
+    Returns the last row of the distance matrix between reversed
+    `lh_str[lh_lo:lh_hi]` and every suffix of `rh_str[rh_lo:rh_hi]`.
+    The i-th value of the row corresponds to the suffix of length i.
+    """
+
+    previous = list(range(rh_hi - rh_lo + 1))
+    for lh_index in range(lh_hi - 1, lh_lo - 1, -1):
+        lh_symbol = lh_str[lh_index]
+        current = [previous[0] + 1]
+
+        for col, rh_index in enumerate(range(rh_hi - 1, rh_lo - 1, -1)):
+            substitution = previous[col] + (lh_symbol != rh_str[rh_index])
+            current.append(min(substitution, previous[col + 1] + 1, current[col] + 1))
+
+        previous = current
+
+    return previous
+
+
+def collect_blocks(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int, int]]:
+    """
+    Groups consecutive matched index pairs into blocks.
+
+    @param pairs: Matched index pairs in increasing order
+    @return: Matched blocks as (lh_start, rh_start, size) triples
+    """
+
+    blocks: List[Tuple[int, int, int]] = []
+    for lh_index, rh_index in pairs:
+        if blocks:
+            lh_start, rh_start, size = blocks[-1]
+            if lh_start + size == lh_index and rh_start + size == rh_index:
+                blocks[-1] = (lh_start, rh_start, size + 1)
+                continue
+
+        blocks.append((lh_index, rh_index, 1))
+
+    return blocks
+
+
+def map_blocks_to_lines(
+    blocks: List[Tuple[int, int, int]],
+    lh_str: str,
+    rh_str: str,
+    lh_line_map: List[int | None],
+    rh_line_map: List[int | None],
+) -> List[MatchedSpan]:
+
+    """
+    Turns matched blocks of the formatted strings into spans of the
+    original source lines. Blocks are cut at line boundaries of both
+    strings, and the pieces are merged while the original lines of both
+    sides keep going consecutively.
+
+    @param blocks: Matched blocks as (lh_start, rh_start, size) triples
+    @param lh_str: left-hand formatted string
+    @param rh_str: right-hand formatted string
+    @param lh_line_map: original line numbers of the left-hand lines
+    @param rh_line_map: original line numbers of the right-hand lines
+    @return: Matched spans of the original sources
+    """
+
+    lh_line_starts = get_line_starts(lh_str)
+    rh_line_starts = get_line_starts(rh_str)
+
+    spans: List[MatchedSpan] = []
+    current: MatchedSpan | None = None
+
+    for lh_start, rh_start, size in blocks:
+        offset = 0
+        while offset < size:
+            lh_line = bisect_right(lh_line_starts, lh_start + offset) - 1
+            rh_line = bisect_right(rh_line_starts, rh_start + offset) - 1
+
+            piece = min(
+                size - offset,
+                get_line_end(lh_line_starts, lh_line, len(lh_str)) - lh_start - offset,
+                get_line_end(rh_line_starts, rh_line, len(rh_str)) - rh_start - offset,
+            )
+            offset += piece
+
+            lh_lineno = lh_line_map[lh_line]
+            rh_lineno = rh_line_map[rh_line]
+            if lh_lineno is None or rh_lineno is None:
+                continue
+
+            if (
+                current is not None
+                and 0 <= lh_lineno - current.lh_last_line <= 1
+                and 0 <= rh_lineno - current.rh_last_line <= 1
+            ):
+                current = current._replace(
+                    lh_last_line=lh_lineno,
+                    rh_last_line=rh_lineno,
+                    chars=current.chars + piece,
+                )
+                continue
+
+            if current is not None:
+                spans.append(current)
+
+            current = MatchedSpan(lh_lineno, lh_lineno, rh_lineno, rh_lineno, piece)
+
+    if current is not None:
+        spans.append(current)
+
+    return [span for span in spans if span.chars >= MIN_SPAN_CHARS]
+
+
+def get_line_starts(string: str) -> List[int]:
+    """
+    Returns offsets of the first symbol of each line in the string.
+    """
+
+    starts = [0]
+    for index, symbol in enumerate(string):
+        if symbol == "\n":
+            starts.append(index + 1)
+
+    return starts
+
+
+def get_line_end(line_starts: List[int], line: int, length: int) -> int:
+    """
+    Returns the offset right after the given line, including its newline.
+    """
+
+    return line_starts[line + 1] if line + 1 < len(line_starts) else length
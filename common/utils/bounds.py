@@ -0,0 +1,71 @@
+"""
+The module describes cheap upper bounds of the similarity ratio. They are
+used to prove that the exact Levenshtein distance is not worth counting.
+"""
+
+from collections import Counter
+from typing import Sequence
+
+
+def get_length_upper_bound(lh_length: int, rh_length: int) -> float:
+    """
+    Returns the upper bound of the similarity ratio which is based only
+    on the lengths of the strings: the distance is never less than the
+    difference of the lengths.
+
+    @param lh_length: length of the left-hand string
+    @param rh_length: length of the right-hand string
+    @return: The upper bound of the similarity ratio
+    """
+
+    # The levenshtein function returns 0 if any of the strings is empty
+    if lh_length == 0 or rh_length == 0:
+        return 1.0
+
+    return 1 - abs(lh_length - rh_length) / max(lh_length, rh_length)
+
+
+def get_histogram_upper_bound(
+    lh_histogram: Counter,
+    rh_histogram: Counter,
+    lh_length: int,
+    rh_length: int,
+) -> float:
+
+    """
+    Returns the upper bound of the similarity ratio which is based on the
+    symbol histograms of the strings: every symbol which is missing on
+    the other side requires at least one edit operation.
+
+    @param lh_histogram: symbol histogram of the left-hand string
+    @param rh_histogram: symbol histogram of the right-hand string
+    @param lh_length: length of the left-hand string
+    @param rh_length: length of the right-hand string
+    @return: The upper bound of the similarity ratio
+    """
+
+    # The levenshtein function returns 0 if any of the strings is empty
+    if lh_length == 0 or rh_length == 0:
+        return 1.0
+
+    lh_excess = sum((lh_histogram - rh_histogram).values())
+    rh_excess = sum((rh_histogram - lh_histogram).values())
+
+    return 1 - max(lh_excess, rh_excess) / max(lh_length, rh_length)
+
+
+def get_ratio_upper_bound(lh_str: Sequence, rh_str: Sequence) -> float:
+    """
+    Returns the tightest of the cheap upper bounds of the similarity ratio.
+
+    @param lh_str: left-hand string
+    @param rh_str: right-hand string
+    @return: The upper bound of the similarity ratio
+    """
+
+    return get_histogram_upper_bound(
+        lh_histogram=Counter(lh_str),
+        rh_histogram=Counter(rh_str),
+        lh_length=len(lh_str),
+        rh_length=len(rh_str),
+    )
@@ -1,7 +1,20 @@
 """
-A module that provides functionality for working with files
+A module that provides functionality for working with files. Besides
+regular files, the paths may refer to members of zip and tar archives,
+e.g. `bundle.zip::student42/main.py`.
 """
 
+import os
+
+from typing import List, Tuple
+
+from common.objects.archive import (
+    ARCHIVE_READER,
+    is_member_path,
+    split_member_path,
+)
+
+
 def get_total_lines(path_to_file: str) -> int:
     """
     Returns the total number of lines in the given file.
@@ -9,3 +22,122 @@ def get_total_lines(path_to_file: str) -> int:
 
     with open(file=path_to_file, mode="r", encoding="utf-8") as file:
         return sum(1 for _ in file)
+
+
+def read_pairs(path_to_file: str) -> List[Tuple[str, str] | None]:
+    """
+    Reads pairs of paths from the input file. Blank lines are kept
+    as None, so the i-th item always corresponds to the i-th line.
+    """
+
+    pairs: List[Tuple[str, str] | None] = []
+    with open(file=path_to_file, mode="r", encoding="utf-8") as file:
+        for line in file:
+            stripped_line = line.strip()
+            pairs.append(tuple(stripped_line.split()) if stripped_line else None)
+
+    return pairs
+
+
+def count_archive_pairs(path_to_archive: str) -> int:
+    """
+    Returns the number of all the pairs of Python files of the archive,
+    which is the number of lines of the output, without listing the pairs.
+    """
+
+    members = len(ARCHIVE_READER.list_members(path_to_archive))
+    return members * (members - 1) // 2
+
+
+def read_source(path_to_file: str) -> str:
+    """
+    Returns the content of the given source file.
+    """
+
+    if is_member_path(path_to_file):
+        return ARCHIVE_READER.read(path_to_file)
+
+    with open(file=path_to_file, mode="r", encoding="utf-8") as file:
+        return file.read()
+
+
+def read_source_with_signature(path_to_file: str) -> Tuple[Tuple[int, int], str]:
+    """
+    Returns the signature of the given source file, taken before
+    reading it, and its content.
+    """
+
+    return get_source_signature(path_to_file), read_source(path_to_file)
+
+
+def source_exists(path_to_file: str) -> bool:
+    """
+    Checks whether the given source file exists.
+    """
+
+    if is_member_path(path_to_file):
+        return ARCHIVE_READER.exists(path_to_file)
+
+    return os.path.exists(path_to_file)
+
+
+def get_source_size(path_to_file: str) -> int:
+    """
+    Returns the size of the given source file in bytes.
+    """
+
+    if is_member_path(path_to_file):
+        return ARCHIVE_READER.get_size(path_to_file)
+
+    return os.path.getsize(path_to_file)
+
+
+def get_source_signature(path_to_file: str) -> Tuple[int, int]:
+    """
+    Returns the modification time and the size of the given source file,
+    which change whenever the file is modified. Members of an archive
+    change together with the archive.
+    """
+
+    if is_member_path(path_to_file):
+        path_to_file = split_member_path(path_to_file)[0]
+
+    file_stat = os.stat(path_to_file)
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+def sort_by_read_order(paths: List[str]) -> List[str]:
+    """
+    Returns the paths in the order they should be read in. Regular files
+    keep their places, and the members of archives take the places of
+    the members in the order of their positions in the archives, so a
+    compressed tar is never read backwards.
+
+    @param paths: The paths to the source files
+    @return: The same paths in the order of reading
+    """
+
+    members = iter(sorted(
+        (path for path in paths if is_member_path(path)),
+        key=lambda path: (split_member_path(path)[0], ARCHIVE_READER.get_offset(path)),
+    ))
+
+    return [next(members) if is_member_path(path) else path for path in paths]
+
+
+def get_archive_path(path_to_file: str) -> str | None:
+    """
+    Returns the path to the archive of the member, or None for a regular file.
+    """
+
+    return split_member_path(path_to_file)[0] if is_member_path(path_to_file) else None
+
+
+def get_content_hash(content: str) -> str:
+    """
+    Returns the hex digest of the SHA-256 hash of the given content.
+    """
+
+    from hashlib import sha256  # pylint: disable=import-outside-toplevel
+
+    return sha256(content.encode("utf-8")).hexdigest()
@@ -6,7 +6,10 @@ applying the Levenshtein algorithm.
 
 import ast
 
+from typing import List, NamedTuple, Tuple
+
 from common.objects.ast_cleaners import (
+    IdentifierCanonicalizer,
     TypeHintCleaner,
     UnusedConstantCleaner,
 )
@@ -22,6 +25,45 @@ from common.objects.code_cleaners import (
 )
 
 
+class NormalizedCode(NamedTuple):
+    """
+    Both formatting variants of the code which are used by the metric.
+    """
+
+    unsorted: str
+    sorted: str
+
+
+def normalize(code: str) -> NormalizedCode:
+    """
+    Formats the code with and without sorting of the structures.
+
+    @param code: Python code that should be normalized
+    @return: Both formatting variants of the code
+    """
+
+    return normalize_with_tree(code)[0]
+
+
+def normalize_with_tree(code: str) -> Tuple[NormalizedCode, ast.Module]:
+    """
+    Formats the code in the same way as `normalize` does and additionally
+    returns the transformed tree of the sorted variant, so the tree can be
+    reused without parsing the code once again.
+
+    @param code: Python code that should be normalized
+    @return: Both formatting variants of the code and the sorted tree
+    """
+
+    sorted_tree = transform_tree(code, sort_structures=True)
+    normalized_code = NormalizedCode(
+        unsorted=pyformat(code, sort_structures=False),
+        sorted=unparse_tree(sorted_tree),
+    )
+
+    return normalized_code, sorted_tree
+
+
 def pyformat(code: str, sort_structures: bool = True) -> str:
     """
     Formats code written in the Python programming language for subsequent
@@ -37,14 +79,52 @@ def pyformat(code: str, sort_structures: bool = True) -> str:
     @return: Formatted Python code
     """
 
+    return unparse_tree(transform_tree(code, sort_structures))
+
+
+def pyformat_with_line_map(
+    code: str,
+    sort_structures: bool = True
+) -> Tuple[str, List[int | None]]:
+
+    """
+    Formats code in the same way as `pyformat` does and additionally maps
+    each line of the formatted code back to the line of the original code
+    it was produced from. Lines which can't be mapped are marked as None.
+
+    @param code: Python code that should be formatted
+    @param sort_structures: Whether to sort functions and classes by
+    lexicographic order
+    @return: Formatted Python code and its line map
+    """
+
+    tree = transform_tree(code, sort_structures)
+    formatted_code = unparse_tree(tree)
+
+    return formatted_code, build_line_map(tree, formatted_code)
+
+
+def transform_tree(code: str, sort_structures: bool = True) -> ast.Module:
+    """
+    Parses the code and applies all the AST cleaners and, if required,
+    the AST sorters to the tree.
+
+    @param code: Python code that should be transformed
+    @param sort_structures: Whether to sort functions and classes by
+    lexicographic order
+    @return: Transformed AST tree
+    """
+
     # Processed automatically:
     # - Comments -> Reduced
     # - The quotes style -> To the unified style
+    # - Names of arguments, local variables and import aliases -> Canonical
 
     tree = ast.parse(code)
     for ast_cleaner in [
         TypeHintCleaner,
         UnusedConstantCleaner,
+        IdentifierCanonicalizer,
     ]:
         tree = ast_cleaner().visit(tree)
 
@@ -55,6 +135,18 @@ def pyformat(code: str, sort_structures: bool = True) -> str:
         ]:
             tree = ast_sorter().visit(tree)
 
+    return tree
+
+
+def unparse_tree(tree: ast.Module) -> str:
+    """
+    Turns the transformed AST tree back into the code and applies
+    all the code cleaners to it.
+
+    @param tree: Transformed AST tree
+    @return: Formatted Python code
+    """
+
     code = ast.unparse(tree)
     for code_cleaner in [
         TrailingWhitespaceCleaner,
@@ -63,3 +155,47 @@ def pyformat(code: str, sort_structures: bool = True) -> str:
         code = code_cleaner().apply(code)
 
     return code
+
+
+def build_line_map(tree: ast.Module, formatted_code: str) -> List[int | None]:
+    """
+    Maps the lines of the formatted code to the lines of the original code.
+    The formatted code is parsed again and its statements are matched with
+    the statements of the transformed tree, which still keep their original
+    positions. If the formatted code can't be parsed or its structure
+    differs from the transformed tree, all the lines are left unmapped.
+
+    @param tree: Transformed AST tree with the original positions
+    @param formatted_code: The code produced from the tree
+    @return: The original line number for each formatted line
+    """
+
+    line_map: List[int | None] = [None] * len(formatted_code.split("\n"))
+
+    try:
+        formatted_tree = ast.parse(formatted_code)
+
+    except SyntaxError:
+        return line_map
+
+    original_statements = [
+        node for node in ast.walk(tree) if isinstance(node, ast.stmt)
+    ]
+
+    formatted_statements = [
+        node for node in ast.walk(formatted_tree) if isinstance(node, ast.stmt)
+    ]
+
+    if len(original_statements) != len(formatted_statements):
+        return line_map
+
+    # Walk is breadth-first, so nested statements override their parents
+    for original, formatted in zip(original_statements, formatted_statements):
+        if type(original) is not type(formatted):
+            return [None] * len(line_map)
+
+        end_lineno = formatted.end_lineno or formatted.lineno
+        for lineno in range(formatted.lineno, end_lineno + 1):
+            line_map[lineno - 1] = getattr(original, "lineno", None)
+
+    return line_map
@@ -2,69 +2,52 @@
 The module is responsible for implementing the Levenshtein algorithm.
 """
 
-from typing import List
+import time
 
+from typing import Tuple
 
-def levenshtein(lh_str: str, rh_str: str) -> int:
+
+class BudgetExceeded(Exception):
+    """
+    Raised when counting the distance takes more than it is allowed.
+    The ratios of the formatting variants which were counted before the
+    budget was exceeded are kept, None means the ratio wasn't counted.
+    """
+
+    ratios: Tuple[float | None, float | None] = (None, None)
+
+
+def levenshtein(lh_str: str, rh_str: str, deadline: float | None = None) -> int:
     """
     Counts the editorial Levenshtein distance between the two strings.
-    We use N * M array isntead of (N + 1) * (M + 1) to reach the best
-    space and time complexity for the algorithm.
+    Only the distance itself is needed, so just two rows of the distance
+    matrix are kept, and the memory is linear in the length of `rh_str`.
+    Each row is built after the deadline is checked, so a pair of huge
+    strings is stopped before it takes much time or memory.
 
     @param lh_str: left-hand string
     @param rh_str: right-hand string
+    @param deadline: `time.perf_counter()` value after which the counting
+    is stopped with the BudgetExceeded error
     @return: The value of the Levenshtein editorial distance
     """
 
-    rows = len(lh_str)
-    cols = len(rh_str)
-
-    if rows == 0 or cols == 0:
+    if not lh_str or not rh_str:
         return 0
 
-    distance = [[0] * cols for _ in range(rows)]
-    for row in range(rows):
-        for col in range(cols):
-
-            lh_symbol = lh_str[row]
-            rh_symbol = rh_str[col]
+    previous = list(range(len(rh_str) + 1))
+    for row, lh_symbol in enumerate(lh_str, start=1):
+        if deadline is not None and time.perf_counter() > deadline:
+            raise BudgetExceeded("the time limit of the pair was exceeded")
 
+        current = [row]
+        for col, rh_symbol in enumerate(rh_str):
             if lh_symbol == rh_symbol:
-                distance[row][col] = get_distance_value(distance, row - 1, col - 1)
+                current.append(previous[col])
 
             else:
-                distance[row][col] = 1 + min(
-                    get_distance_value(distance, row, col - 1),
-                    get_distance_value(distance, row - 1, col - 1),
-                    get_distance_value(distance, row - 1, col),
-                )
-
-    return distance[-1][-1]
-
-
-def get_distance_value(distance: List[List[int]], row: int, col: int) -> int:
-    """
-    Returns the value of the Levenshtein distance between the two strings
-    from the given distance array.
-
-    Due to using N * M array instead of (N + 1) * (M + 1) it is better to
-    use such a function for the best performance and readability. Approach
-    with using N * M array helps to reduce space and time complexity.
-
-    @param distance: The array with Levenshtein distances
-    @param row: The row index
-    @param col: The column index
-    @return: The value of the Levenshtein distance
-    """
-
-    if row == -1 and col == -1:
-        return 0
-
-    elif row == -1:
-        return col + 1
+                current.append(1 + min(current[col], previous[col], previous[col + 1]))
 
-    elif col == -1:
-        return row + 1
+        previous = current
 
-    else:
-        return distance[row][col]
+    return previous[-1]
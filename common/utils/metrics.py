@@ -3,8 +3,60 @@ The module describes how to work with metrics that are
 used to analyze thedegree of similarity of programs.
 """
 
-from common.utils.levenshtein import levenshtein
-from common.utils.format import pyformat
+import os
+import time
+
+from collections import Counter
+from typing import Dict, NamedTuple, Tuple
+
+from common.utils.bounds import get_length_upper_bound, get_ratio_upper_bound
+from common.utils.levenshtein import BudgetExceeded, levenshtein
+from common.utils.format import NormalizedCode, normalize
+
+
+# Change the version whenever the normalization or the metric changes
+# the ratios: the ratios of other versions are not reused
+METRIC_VERSION = 2
+
+# How many times each way of calculating the metric was used
+SHORTCUT_COUNTERS = Counter(
+    equal_forms=0,  # Equal normalized forms, no distance was counted
+    equal_variants=0,  # Sorting changed nothing, one distance was counted
+    pruned_by_bound=0,  # The second distance was proved to be useless
+    both_variants=0,  # Both distances were counted
+    over_budget=0,  # The pair exceeded its budget
+    filtered_by_structure=0,  # The structural similarity was too low
+)
+
+
+class MetricResult(NamedTuple):
+    """
+    The detailed result of the metric calculation. The ratio of a
+    formatting variant is None if its distance was not counted. The
+    status is "exact", "approximate" or "skipped", and the reason
+    explains why the pair was not counted exactly. The structural ratio
+    is None unless the structural similarity was required.
+    """
+
+    ratio: float | None
+    unsorted_ratio: float | None
+    sorted_ratio: float | None
+    seconds: float
+    status: str = "exact"
+    reason: str | None = None
+    structural_ratio: float | None = None
+
+
+class PairBudget(NamedTuple):
+    """
+    The limits of counting the metric of a single pair. When a limit is
+    exceeded, the pair is either estimated cheaply or skipped, according
+    to the fallback: "estimate" or "skip".
+    """
+
+    max_seconds: float | None = None
+    max_cells: int | None = None
+    fallback: str = "estimate"
 
 
 def calculate_metric(
@@ -22,29 +74,219 @@ def calculate_metric(
     @return: The value of the metric
     """
 
-    unsorted_lh_code = pyformat(lh_code, sort_structures=False)
-    unsorted_rh_code = pyformat(rh_code, sort_structures=False)
+    return calculate_normalized_metric(
+        lh_code=normalize(lh_code),
+        rh_code=normalize(rh_code),
+        use_percent=use_percent,
+    )
 
-    sorted_lh_code = pyformat(lh_code, sort_structures=True)
-    sorted_rh_code = pyformat(rh_code, sort_structures=True)
 
-    unsorted_ratio = get_similarity_ratio(unsorted_lh_code, unsorted_rh_code)
-    sorted_ratio = get_similarity_ratio(sorted_lh_code, sorted_rh_code)
+def calculate_normalized_metric(
+    lh_code: NormalizedCode,
+    rh_code: NormalizedCode,
+    use_percent: bool = False
+) -> float | int:
+
+    """
+    Calculates the similarity metric between two already normalized
+    programs. For details look at function `calculate_metric_result`.
 
-    ratio = max(unsorted_ratio, sorted_ratio)  # Choose more strict metric
+    @param lh_code: left-hand normalized code to compare
+    @param rh_code: right-hand normalized code to compare
+    @param use_percent: whether to use percents instead of ratio metric
+    @return: The value of the metric
+    """
+
+    ratio = calculate_metric_result(lh_code, rh_code).ratio
     return ratio * 100 if use_percent else ratio
 
 
-def get_similarity_ratio(lh_str: str, rh_str: str) -> float:
+def calculate_metric_result(
+    lh_code: NormalizedCode,
+    rh_code: NormalizedCode,
+    budget: PairBudget | None = None
+) -> MetricResult:
+
+    """
+    Calculates the similarity ratio between two already normalized
+    programs. The second Levenshtein distance is counted only if it can
+    change the result: it is skipped when sorting changed neither of the
+    programs or when its cheap upper bound doesn't exceed the first ratio.
+
+    If the budget is exceeded, the pair is skipped, or its ratio is the
+    maximum of the exact ratios counted before and of the estimates of
+    both formatting variants.
+
+    @param lh_code: left-hand normalized code to compare
+    @param rh_code: right-hand normalized code to compare
+    @param budget: The limits of counting the metric
+    @return: The detailed result of the metric
+    """
+
+    started_at = time.perf_counter()
+    unsorted_ratio = None
+    sorted_ratio = None
+
+    limits = {}
+    if budget is not None:
+        if budget.max_seconds is not None:
+            limits["deadline"] = started_at + budget.max_seconds
+
+        limits["max_cells"] = budget.max_cells
+
+    try:
+        unsorted_ratio, sorted_ratio = calculate_variant_ratios(lh_code, rh_code, **limits)
+
+    except BudgetExceeded as error:
+        SHORTCUT_COUNTERS["over_budget"] += 1
+
+        unsorted_ratio, sorted_ratio = error.ratios
+
+        ratio = None
+        if budget.fallback == "estimate":
+            ratio = max(
+                estimate_similarity_ratio(lh_code.unsorted, rh_code.unsorted),
+                estimate_similarity_ratio(lh_code.sorted, rh_code.sorted),
+                *(exact for exact in error.ratios if exact is not None),
+            )
+
+        return MetricResult(
+            ratio=ratio,
+            unsorted_ratio=unsorted_ratio,
+            sorted_ratio=sorted_ratio,
+            seconds=time.perf_counter() - started_at,
+            status="approximate" if ratio is not None else "skipped",
+            reason=str(error),
+        )
+
+    return MetricResult(
+        ratio=max(ratio for ratio in (unsorted_ratio, sorted_ratio) if ratio is not None),
+        unsorted_ratio=unsorted_ratio,
+        sorted_ratio=sorted_ratio,
+        seconds=time.perf_counter() - started_at,
+    )
+
+
+def calculate_variant_ratios(
+    lh_code: NormalizedCode,
+    rh_code: NormalizedCode,
+    deadline: float | None = None,
+    max_cells: int | None = None
+) -> Tuple[float | None, float | None]:
+
+    """
+    Calculates the similarity ratios of both formatting variants, except
+    for the ones which can't change the result of the metric. If the budget
+    is exceeded, the ratios counted before are passed with the error.
+
+    @param lh_code: left-hand normalized code to compare
+    @param rh_code: right-hand normalized code to compare
+    @param deadline: `time.perf_counter()` value to stop counting at
+    @param max_cells: The maximal size of the distance matrix
+    @return: The ratios of the unsorted and sorted variants
+    """
+
+    unsorted_ratio = None
+    sorted_ratio = None
+
+    if lh_code.unsorted == rh_code.unsorted or lh_code.sorted == rh_code.sorted:
+        SHORTCUT_COUNTERS["equal_forms"] += 1
+
+        if lh_code.unsorted == rh_code.unsorted:
+            unsorted_ratio = 1.0
+
+        if lh_code.sorted == rh_code.sorted:
+            sorted_ratio = 1.0
+
+    elif lh_code.unsorted == lh_code.sorted and rh_code.unsorted == rh_code.sorted:
+        SHORTCUT_COUNTERS["equal_variants"] += 1
+        unsorted_ratio = get_similarity_ratio(
+            lh_code.unsorted, rh_code.unsorted, deadline, max_cells
+        )
+        sorted_ratio = unsorted_ratio
+
+    else:
+        unsorted_ratio = get_similarity_ratio(
+            lh_code.unsorted, rh_code.unsorted, deadline, max_cells
+        )
+
+        if (
+            unsorted_ratio >= get_length_upper_bound(len(lh_code.sorted), len(rh_code.sorted))
+            or unsorted_ratio >= get_ratio_upper_bound(lh_code.sorted, rh_code.sorted)
+        ):
+            SHORTCUT_COUNTERS["pruned_by_bound"] += 1
+
+        else:
+            SHORTCUT_COUNTERS["both_variants"] += 1
+            try:
+                sorted_ratio = get_similarity_ratio(
+                    lh_code.sorted, rh_code.sorted, deadline, max_cells
+                )
+            except BudgetExceeded as error:
+                error.ratios = (unsorted_ratio, None)
+                raise
+
+    return unsorted_ratio, sorted_ratio
+
+
+def get_shortcut_counters() -> Dict[str, int]:
+    """
+    Returns how many times each way of calculating the metric was used.
+    """
+
+    return dict(SHORTCUT_COUNTERS)
+
+
+def get_similarity_ratio(
+    lh_str: str,
+    rh_str: str,
+    deadline: float | None = None,
+    max_cells: int | None = None
+) -> float:
+
     """
     Calculates the similarity ratio between two strings.
 
     @param lh: left-hand string
     @param rh: right-hand string
+    @param deadline: `time.perf_counter()` value to stop counting at
+    @param max_cells: The maximal size of the distance matrix
     @return: The similarity ratio
     """
 
-    levenshtein_distance = levenshtein(lh_str, rh_str)
+    cells = len(lh_str) * len(rh_str)
+    if max_cells is not None and cells > max_cells:
+        raise BudgetExceeded(
+            f"the distance matrix of {cells} cells exceeds the limit of {max_cells}"
+        )
+
+    levenshtein_distance = levenshtein(lh_str, rh_str, deadline)
     str_length = max(len(lh_str), len(rh_str))
 
     return 1.0 if str_length == 0 else 1 - levenshtein_distance / str_length
+
+
+def estimate_similarity_ratio(lh_str: str, rh_str: str) -> float:
+    """
+    Estimates the similarity ratio between two strings in linear time.
+    Lines which both strings have are considered to be matched, and the
+    rest of the symbols are considered to be edited. The common prefix and
+    suffix are matched as well, so strings of one line which differ in
+    a few symbols don't get zero.
+
+    @param lh: left-hand string
+    @param rh: right-hand string
+    @return: The estimated similarity ratio
+    """
+
+    str_length = max(len(lh_str), len(rh_str))
+    if str_length == 0:
+        return 1.0
+
+    common_lines = Counter(lh_str.split("\n")) & Counter(rh_str.split("\n"))
+    matched = sum((len(line) + 1) * count for line, count in common_lines.items())
+
+    prefix = len(os.path.commonprefix([lh_str, rh_str]))
+    suffix = len(os.path.commonprefix([lh_str[prefix:][::-1], rh_str[prefix:][::-1]]))
+
+    return min(max(matched, prefix + suffix), str_length) / str_length
@@ -0,0 +1,52 @@
+"""
+The module describes the format of the lines of the output file, so the
+entry point only decides which lines are written.
+"""
+
+from typing import Tuple
+
+from common.utils.metrics import MetricResult
+
+
+def format_output_line(
+    result: MetricResult,
+    use_percent: bool = False,
+    lineno: int | None = None,
+    paths: Tuple[str, str] | None = None
+) -> str:
+
+    """
+    Formats the result of the pair as a line of the output file. Looks
+    like this:
+
+    [lineno] [lh_path rh_path] 0.93 [approximate] [structural=0.38]
+
+    @param result: The detailed result of the metric
+    @param use_percent: whether to use percents instead of ratio metric
+    @param lineno: The number of the input line, which is written by shards
+    @param paths: The paths to the files, which are written for all the
+    pairs of an archive
+    @return: The line without the line break
+    """
+
+    multiplier, sign = (100, "%") if use_percent else (1, "")
+
+    parts = []
+    if lineno is not None:
+        parts.append(str(lineno))
+
+    if paths is not None:
+        parts.extend(paths)
+
+    if result.status == "skipped":
+        parts.append(f"skipped: {result.reason}")
+
+    else:
+        parts.append(f"{result.ratio * multiplier}{sign}")
+        if result.status == "approximate":
+            parts.append("approximate")
+
+    if result.structural_ratio is not None:
+        parts.append(f"structural={result.structural_ratio * multiplier}{sign}")
+
+    return " ".join(parts)
@@ -0,0 +1,69 @@
+"""
+The module describes the read-ahead of files. Reading files from network
+storage takes time during which the processor has nothing to do, so the
+files are read by background threads while the processor parses the
+files which are already read.
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Hashable, Iterable, Iterator, Tuple, TypeVar
+
+
+PREFETCH_THREADS = 4
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+
+def prefetch(
+    items: Iterable[Item],
+    loader: Callable[[Item], Result],
+    depth: int = 16,
+    key: Callable[[Item], Hashable | None] | None = None,
+) -> Iterator[Tuple[Item, Result]]:
+
+    """
+    Loads the items in background threads, keeping at most `depth` of
+    them loaded or being loaded ahead of the consumer. The items are
+    returned in the given order, and errors of the loader are raised
+    when the failed item is reached.
+
+    Items with the same key, e.g. members of one archive, are loaded one
+    after another in the given order. Tasks are started in the order of
+    submission, so the previous item of the key is always being loaded
+    or already loaded when the next one waits for it.
+
+    @param items: The items to load, e.g. paths to files
+    @param loader: The function which loads an item
+    @param depth: The maximal number of items loaded ahead
+    @param key: The function which returns the key of an item or None
+    @return: The iterator over the items and their loaded values
+    """
+
+    def load_after(item: Item, previous: Future | None) -> Result:
+        if previous is not None:
+            wait([previous])
+
+        return loader(item)
+
+    with ThreadPoolExecutor(max_workers=min(PREFETCH_THREADS, max(depth, 1))) as executor:
+        pending: Deque = deque()
+        last_futures: Dict[Hashable, Future] = {}
+
+        for item in items:
+            item_key = key(item) if key is not None else None
+            future = executor.submit(load_after, item, last_futures.get(item_key))
+
+            if item_key is not None:
+                last_futures[item_key] = future
+
+            pending.append((item, future))
+
+            if len(pending) >= depth:
+                item, future = pending.popleft()
+                yield item, future.result()
+
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
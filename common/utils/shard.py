@@ -0,0 +1,212 @@
+"""
+The module describes how pairs of files are split between shards, so a
+single batch can be processed by several machines at once. All the pairs
+of an archive are never listed: the members are split into blocks, and
+the pairs of blocks are split between shards instead.
+"""
+
+from typing import Dict, Iterator, List, Self, Tuple
+
+from common.utils.file import get_source_size
+
+
+# How many pairs of blocks of an archive there are per shard at least.
+# More pairs balance the shards better, but each shard reads more members
+BLOCK_PAIRS_PER_SHARD = 4
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parses the shard written as K/N, where K is the number of the shard
+    starting from 1 and N is the total number of shards.
+
+    @param value: The shard written as K/N
+    @return: The number of the shard and the total number of shards
+    """
+
+    shard, _, shards = value.partition("/")
+    if not shard.isdigit() or not shards.isdigit() or not 1 <= int(shard) <= int(shards):
+        raise ValueError(f"The shard must look like K/N, where 1 <= K <= N: {value}")
+
+    return int(shard), int(shards)
+
+
+def estimate_cost(lh_path: str, rh_path: str) -> int:
+    """
+    Estimates the cost of comparing two files. The Levenshtein algorithm
+    is quadratic, so the product of the sizes of the files is used. Sizes
+    of the files are taken instead of the sizes of the normalized code,
+    since every shard has to estimate all the pairs.
+    """
+
+    return max(get_source_size(lh_path), 1) * max(get_source_size(rh_path), 1)
+
+
+def assign_shards(
+    pairs: List[Tuple[str, str] | None],
+    shards: int
+) -> List[int | None]:
+
+    """
+    Deterministically splits the pairs between shards, balancing them by
+    the estimated cost. Repeated and reversed pairs are put to the same
+    shard, so they are still computed only once. The most expensive pairs
+    are assigned first, each to the least loaded shard.
+
+    @param pairs: Pairs of paths, None for blank lines
+    @param shards: The total number of shards
+    @return: The number of the shard starting from 1 for each pair
+    """
+
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for number, pair in enumerate(pairs):
+        if pair is not None:
+            groups.setdefault(tuple(sorted(pair)), []).append(number)
+
+    ordered_groups = sorted(
+        groups.items(),
+        key=lambda group: (-estimate_cost(*group[0]), group[1][0]),
+    )
+
+    loads = [0] * shards
+    assignment: List[int | None] = [None] * len(pairs)
+
+    for pair, numbers in ordered_groups:
+        shard = min(range(shards), key=lambda shard: (loads[shard], shard))
+        loads[shard] += estimate_cost(*pair)
+
+        for number in numbers:
+            assignment[number] = shard + 1
+
+    return assignment
+
+
+def select_shard(
+    pairs: List[Tuple[str, str] | None],
+    shard: Tuple[int, int] | None
+) -> List[Tuple[str, str] | None]:
+
+    """
+    Keeps only the pairs of the given shard, the pairs of other shards are
+    replaced with None, so the i-th item still corresponds to the i-th line.
+
+    @param pairs: Pairs of paths, None for blank lines
+    @param shard: The number of the shard and the total number of shards,
+    None to keep all the pairs
+    @return: The pairs of the shard
+    """
+
+    if shard is None:
+        return pairs
+
+    number, shards = shard
+    return [
+        pair if assigned_shard == number else None
+        for pair, assigned_shard in zip(pairs, assign_shards(pairs, shards))
+    ]
+
+
+class ArchiveShard(object):
+    """
+    A class that iterates the pairs of the members of an archive which
+    belong to the shard, without building the list of all the pairs. The
+    line of a pair is its number among all the pairs of the archive, and
+    a shard reads only the members of its blocks.
+    """
+
+    __slots__ = [
+        "_block_pairs",
+        "_bounds",
+        "_members",
+    ]
+
+    def __init__(
+        self: Self,
+        members: List[str],
+        shard: Tuple[int, int] | None = None
+    ) -> None:
+
+        number, shards = shard if shard is not None else (1, 1)
+
+        # A single shard needs neither blocks nor the sizes of the members
+        blocks = 1
+        while shards > 1 and blocks < len(members) \
+                and blocks * (blocks + 1) // 2 < BLOCK_PAIRS_PER_SHARD * shards:
+            blocks += 1
+
+        self._members = members
+        self._bounds = [block * len(members) // blocks for block in range(blocks + 1)]
+
+        sizes = [
+            [max(get_source_size(member), 1) for member in members[start:stop]]
+            for start, stop in zip(self._bounds, self._bounds[1:])
+        ] if shards > 1 else [[] for _ in range(blocks)]
+
+        costs = {}
+        for lh_block, lh_sizes in enumerate(sizes):
+            for rh_block in range(lh_block, blocks):
+                if lh_block == rh_block:
+                    cost = (sum(lh_sizes) ** 2 - sum(size ** 2 for size in lh_sizes)) // 2
+                else:
+                    cost = sum(lh_sizes) * sum(sizes[rh_block])
+
+                costs[(lh_block, rh_block)] = cost
+
+        # The most expensive pairs of blocks go first to the least loaded shard
+        loads = [0] * shards
+        self._block_pairs: List[Tuple[int, int]] = []
+
+        for block_pair, cost in sorted(costs.items(), key=lambda item: (-item[1], item[0])):
+            assigned_shard = min(range(shards), key=lambda shard: (loads[shard], shard))
+            loads[assigned_shard] += cost
+
+            if assigned_shard + 1 == number:
+                self._block_pairs.append(block_pair)
+
+        self._block_pairs.sort()
+
+    def __len__(self: Self) -> int:
+        count = 0
+        for lh_block, rh_block in self._block_pairs:
+            lh_count = self._bounds[lh_block + 1] - self._bounds[lh_block]
+            rh_count = self._bounds[rh_block + 1] - self._bounds[rh_block]
+
+            if lh_block == rh_block:
+                count += lh_count * (lh_count - 1) // 2
+            else:
+                count += lh_count * rh_count
+
+        return count
+
+    def __iter__(self: Self) -> Iterator[Tuple[int, Tuple[str, str]]]:
+        """
+        Iterates the pairs of the shard with their lines. Without shards
+        the pairs go in the order of their lines.
+        """
+
+        total = len(self._members)
+        for lh_block, rh_block in self._block_pairs:
+            for lh_index in range(self._bounds[lh_block], self._bounds[lh_block + 1]):
+                # The pairs of the row of the member start after this line
+                first_line = lh_index * total - lh_index * (lh_index + 1) // 2 - lh_index
+
+                for rh_index in range(
+                    max(lh_index + 1, self._bounds[rh_block]),
+                    self._bounds[rh_block + 1],
+                ):
+                    yield (
+                        first_line + rh_index,
+                        (self._members[lh_index], self._members[rh_index]),
+                    )
+
+    def get_members(self: Self) -> List[str]:
+        """
+        Returns the members of the blocks of the shard in their order.
+        """
+
+        blocks = sorted({block for block_pair in self._block_pairs for block in block_pair})
+        return [
+            member
+            for block in blocks
+            for member in self._members[self._bounds[block]:self._bounds[block + 1]]
+        ]
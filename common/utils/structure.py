@@ -0,0 +1,92 @@
+"""
+The module describes the structural similarity of programs. Every
+statement and expression of the transformed tree gets a hash of its
+whole subtree, and the programs are compared by the multisets of these
+hashes. It takes linear time, so it is used as a cheap pre-score before
+the Levenshtein algorithm.
+"""
+
+import ast
+
+from collections import Counter
+from typing import Tuple
+
+
+def get_structure_fingerprint(tree: ast.Module) -> Counter:
+    """
+    Builds the multiset of the subtree hashes of the program. The tree must
+    be transformed in the same way as for the sorted formatting variant, so
+    swapped functions and renamed variables don't change the fingerprint.
+    Hashes are built with the `hash` function, so fingerprints can only
+    be compared within one process.
+
+    @param tree: The transformed tree of the sorted formatting variant
+    @return: The numbers of subtrees by their hashes and sizes
+    """
+
+    fingerprint: Counter = Counter()
+    hash_subtree(tree, fingerprint)
+
+    return fingerprint
+
+
+def hash_subtree(node: ast.AST, fingerprint: Counter) -> Tuple[int, int]:
+    """
+    Calculates the hash of the subtree bottom-up and adds the subtrees
+    of statements and expressions to the fingerprint. Positions of the
+    nodes are not a part of the hash.
+
+    @param node: The root of the subtree
+    @param fingerprint: The multiset to add the subtrees to
+    @return: The hash of the subtree and the number of its statements
+    and expressions
+    """
+
+    size = 1 if isinstance(node, (ast.stmt, ast.expr)) else 0
+    fields = []
+
+    for name, value in ast.iter_fields(node):
+        items = []
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, ast.AST):
+                item, item_size = hash_subtree(item, fingerprint)
+                size += item_size
+
+            items.append(item)
+
+        fields.append((name, tuple(items)))
+
+    subtree_hash = hash((type(node).__name__, tuple(fields)))
+    if isinstance(node, (ast.stmt, ast.expr)):
+        fingerprint[(subtree_hash, size)] += 1
+
+    return subtree_hash, size
+
+
+def calculate_structural_similarity(lh_fingerprint: Counter, rh_fingerprint: Counter) -> float:
+    """
+    Calculates the similarity of two fingerprints. Common subtrees are
+    weighted by their sizes, so a shared function counts much more than
+    a shared name, and the total weight is divided by the weight of the
+    larger program.
+
+    @param lh_fingerprint: left-hand fingerprint to compare
+    @param rh_fingerprint: right-hand fingerprint to compare
+    @return: The similarity ratio from 0 to 1
+    """
+
+    lh_weight = sum(size * count for (_, size), count in lh_fingerprint.items())
+    rh_weight = sum(size * count for (_, size), count in rh_fingerprint.items())
+    if lh_weight == 0 or rh_weight == 0:
+        return 1.0 if lh_weight == rh_weight else 0.0
+
+    if len(lh_fingerprint) > len(rh_fingerprint):
+        lh_fingerprint, rh_fingerprint = rh_fingerprint, lh_fingerprint
+
+    common_weight = sum(
+        size * min(count, rh_fingerprint[(subtree_hash, size)])
+        for (subtree_hash, size), count in lh_fingerprint.items()
+        if (subtree_hash, size) in rh_fingerprint
+    )
+
+    return common_weight / max(lh_weight, rh_weight)
@@ -7,10 +7,6 @@ to change the behavior of the functions.
 import common.utils.stdout as stdout
 
 from common.objects.parser import ARGUMENT_PARSER
-from common.objects.validator import ARGUMENT_VALIDATOR
-
-from common.utils.file import get_total_lines
-from common.utils.metrics import calculate_metric
 
 
 ALWAYS_FORCE_WRITE = True
@@ -22,39 +18,152 @@ if __name__ == "__main__":
     if ALWAYS_FORCE_WRITE:
         args.force = True
 
+    # The rest is imported only when it is needed, so --help doesn't pay
+    # for the validation and invalid arguments don't pay for the comparison
+    # pylint: disable=import-outside-toplevel
+    from common.objects.validator import ARGUMENT_VALIDATOR
+
     ARGUMENT_VALIDATOR.validate_args(args)  # Exits with an error if not valid
 
-    lines = get_total_lines(args.input)
-    scores = []
+    from common.objects.pipeline import ComparisonPipeline, get_pair_key
 
-    stdout.message(title="ANALYSIS", msg="Starting to compare files.")
-    stdout.progress_bar(current=0, total=lines, title="ANALYSIS")
+    from common.utils.metrics import MetricResult, PairBudget, get_shortcut_counters
+    from common.utils.output import format_output_line
 
-    with open(file=args.input, mode="r", encoding="utf-8") as input_file:
-        output_file = open(file=args.output, mode="w", encoding="utf-8")
+    pairs = ARGUMENT_VALIDATOR.take_pairs()  # Only the pairs of the shard
+    total = len(pairs)
 
-        for lineno, line in enumerate(input_file, start=1):
-            stripped_line = line.strip()
+    if args.shard is not None:
+        shard, shards = args.shard
+        stdout.message(title="SHARD", msg=f"Comparing only shard {shard} of {shards}.")
 
-            if not stripped_line:
-                output_file.write("\n")
-                continue  # Skip blank lines
+    manifest = None
+    if args.manifest is not None:
+        from common.objects.manifest import ResultsManifest
 
-            path_to_lh, path_to_rh = stripped_line.split()
-            with open(path_to_lh, mode="r", encoding="utf-8") as lh_file:
-                lh_code = lh_file.read()
+        manifest = ResultsManifest(args.manifest)
+        stdout.message(title="MANIFEST", msg=f"Known pairs: {len(manifest)}.")
 
-            with open(path_to_rh, mode="r", encoding="utf-8") as rh_file:
-                rh_code = rh_file.read()
+    budget = None
+    if args.max_pair_seconds is not None or args.max_cells is not None:
+        budget = PairBudget(
+            max_seconds=args.max_pair_seconds,
+            max_cells=args.max_cells,
+            fallback=args.budget_fallback,
+        )
 
-            score = calculate_metric(
-                lh_code=lh_code,
-                rh_code=rh_code,
-                use_percent=args.percent
-            )
+    pipeline = ComparisonPipeline(
+        manifest=manifest,
+        revalidate=False,
+        budget=budget,
+        structural=args.structural,
+        structural_threshold=args.structural_threshold,
+        alignment=args.alignment is not None,
+    )
 
-            output_file.write(f"{score}{'%' if args.percent else ''}\n")
-            stdout.progress_bar(current=lineno, total=lines, title="ANALYSIS")
+    # The validator has already read the files, so they are not read again
+    pipeline.load_sources(ARGUMENT_VALIDATOR.take_sources())
 
-    output_file.close()
+    if args.workers > 1 and args.alignment is None:
+        stdout.message(title="WORKERS", msg=f"Comparing files in {args.workers} processes.")
+
+        for done, total in pipeline.compute_in_parallel(
+            pairs=(pair for _, pair in pairs if pair is not None),
+            workers=args.workers,
+        ):
+            stdout.progress_bar(current=done, total=total, title="WORKERS")
+
+    stdout.message(title="ANALYSIS", msg="Starting to compare files.")
+    stdout.progress_bar(current=0, total=total, title="ANALYSIS")
+
+    output_file = open(file=args.output, mode="w", encoding="utf-8")
+    alignment_file = None
+    if args.alignment is not None:
+        alignment_file = open(file=args.alignment, mode="w", encoding="utf-8")
+
+    store = None
+    if args.sqlite is not None:
+        from common.objects.store import ResultsStore
+
+        store = ResultsStore(args.sqlite, input_path=args.input)
+
+    try:
+        for done, (lineno, pair) in enumerate(pairs, start=1):
+            if pair is None:
+                if args.shard is None:
+                    output_file.write("\n")
+
+                stdout.progress_bar(current=done, total=total, title="ANALYSIS")
+                continue  # Skip blank lines and pairs of other shards
+
+            path_to_lh, path_to_rh = pair
+            hashes = (pipeline.load(path_to_lh), pipeline.load(path_to_rh))
+
+            if alignment_file is None:
+                result = pipeline.compare_loaded(*hashes)
+
+            else:
+                report = pipeline.align(path_to_lh, path_to_rh)
+                result = MetricResult(
+                    ratio=report.ratio,
+                    unsorted_ratio=None,
+                    sorted_ratio=None,
+                    seconds=report.seconds,
+                )
+
+                if args.structural != "off":
+                    result = result._replace(
+                        structural_ratio=pipeline.get_structural_ratio(get_pair_key(*hashes))
+                    )
+
+                alignment_file.write(
+                    f"[{lineno}] {path_to_lh} {path_to_rh} "
+                    f"score={report.ratio * 100 if args.percent else report.ratio} "
+                    f"variant={report.variant}\n"
+                )
+                for span in report.spans:
+                    alignment_file.write(
+                        f"    {span.lh_first_line}-{span.lh_last_line} ~ "
+                        f"{span.rh_first_line}-{span.rh_last_line} "
+                        f"({span.chars} chars)\n"
+                    )
+
+            if store is not None:
+                store.add(lineno=lineno, paths=pair, hashes=hashes, result=result)
+
+            output_file.write(format_output_line(
+                result=result,
+                use_percent=args.percent,
+                lineno=lineno if args.shard is not None else None,
+                paths=pair if args.all_pairs else None,
+            ) + "\n")
+
+            stdout.progress_bar(current=done, total=total, title="ANALYSIS")
+
+    finally:
+        output_file.close()
+        if alignment_file is not None:
+            alignment_file.close()
+
+        # The manifest is saved first, so a failure of the store can't lose it
+        if manifest is not None:
+            manifest.save()
+
+        if store is not None:
+            store.close()
+
+    if store is not None:
+        stdout.message(title="SQLITE", msg=f"Results are saved as run {store.run_id}.")
+
+    stdout.message(
+        title="ANALYSIS",
+        msg=f"Computed pairs: {pipeline.computed}, reused: {pipeline.reused}, "
+        f"restored from the manifest: {pipeline.restored}."
+    )
+    stdout.message(
+        title="ANALYSIS",
+        msg="Metric shortcuts: " + ", ".join(
+            f"{name}={count}" for name, count in get_shortcut_counters().items()
+        ) + "."
+    )
     stdout.message(title="ANALYSIS", msg="Status: FINISHED.")
@@ -0,0 +1,74 @@
+"""
+The file is the entry point for working with the corpus index. Building
+the index once allows to find the files which are most similar to a late
+submission without comparing it with the whole corpus pair by pair.
+"""
+
+import os
+import sys
+
+import common.utils.stdout as stdout
+
+from common.objects.index import CorpusIndex
+from common.objects.parser import INDEX_ARGUMENT_PARSER
+
+from common.utils.file import read_source
+
+
+def fail(msg: str) -> None:
+    """
+    Lists the error to the console and exits the program.
+    """
+
+    stdout.message(title="ERROR", msg=msg)
+    stdout.message(title="INDEX", msg="Status: FAIL.")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+
+    args = INDEX_ARGUMENT_PARSER.parse_args()
+
+    if args.command == "build":
+        index = CorpusIndex.load(args.index) if os.path.exists(args.index) else CorpusIndex()
+
+        paths = list(args.files)
+        if args.list is not None:
+            with open(file=args.list, mode="r", encoding="utf-8") as list_file:
+                paths.extend(line.strip() for line in list_file if line.strip())
+
+        stdout.message(title="INDEX", msg="Normalizing files.")
+        stdout.progress_bar(current=0, total=len(paths), title="INDEX")
+
+        for number, path in enumerate(paths, start=1):
+            try:
+                index.add(path)
+
+            except (OSError, SyntaxError) as error:
+                stdout.newline()
+                fail(f"The file can't be indexed: {path} ({error})")
+
+            stdout.progress_bar(current=number, total=len(paths), title="INDEX")
+
+        index.save(args.index)
+        stdout.message(title="INDEX", msg=f"Files in the index: {len(index)}.")
+        stdout.message(title="INDEX", msg="Status: FINISHED.")
+
+    elif args.command == "query":
+        if not os.path.exists(args.index):
+            fail(f"The index does not seem to exist: {args.index}")
+
+        try:
+            code = read_source(args.file)
+            results = CorpusIndex.load(args.index).query(
+                code=code,
+                k=args.k,
+                exclude=args.file,
+            )
+
+        except (OSError, SyntaxError, ValueError) as error:
+            fail(f"The query can't be completed: {error}")
+
+        for path, ratio in results:
+            score = ratio * 100 if args.percent else ratio
+            sys.stdout.write(f"{path} {score}{'%' if args.percent else ''}\n")
@@ -0,0 +1,71 @@
+"""
+The file is the entry point for combining the outputs of the shards. Each
+line of a shard output contains the number of the input line and its
+value, so the lines are put back into the order of the input file.
+"""
+
+import sys
+
+import common.utils.stdout as stdout
+
+from common.objects.parser import MERGE_ARGUMENT_PARSER
+
+from common.utils.file import count_archive_pairs, read_pairs
+
+
+if __name__ == "__main__":
+
+    args = MERGE_ARGUMENT_PARSER.parse_args()
+
+    # The pairs of an archive are not listed, every line of its output has a pair
+    if args.all_pairs:
+        lines = count_archive_pairs(args.input)
+        pair_lines = range(1, lines + 1)
+
+    else:
+        pairs = read_pairs(args.input)
+        lines = len(pairs)
+        pair_lines = {lineno for lineno, pair in enumerate(pairs, start=1) if pair is not None}
+
+    scores = {}
+    errors = []
+
+    for path in args.shards:
+        with open(file=path, mode="r", encoding="utf-8") as shard_file:
+            for line in shard_file:
+                if not line.strip():
+                    continue
+
+                lineno, _, score = line.strip().partition(" ")
+                if not lineno.isdigit() or not score:
+                    errors.append(f"The shard has a line of the wrong format: {path}")
+                    break
+
+                lineno = int(lineno)
+                if lineno not in pair_lines:
+                    errors.append(
+                        f"The shard has a value for line {lineno} which is not "
+                        f"a pair of the input file: {path}"
+                    )
+
+                elif lineno in scores:
+                    errors.append(f"Line {lineno} has values in several shards.")
+
+                scores[lineno] = score
+
+    for lineno in pair_lines:
+        if lineno not in scores:
+            errors.append(f"Line {lineno} has no value in any of the shards.")
+
+    for error in errors:
+        stdout.message(title="ERROR", msg=error)
+
+    if errors:
+        stdout.message(title="MERGE", msg="Status: FAIL.")
+        sys.exit(1)
+
+    with open(file=args.output, mode="w", encoding="utf-8") as output_file:
+        for lineno in range(1, lines + 1):
+            output_file.write(f"{scores[lineno]}\n" if lineno in pair_lines else "\n")
+
+    stdout.message(title="MERGE", msg="Status: FINISHED.")
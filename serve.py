@@ -0,0 +1,39 @@
+"""
+The file is the entry point of the CODERNA server. Unlike compare.py, the
+server is started once and answers many requests, so the interpreter
+startup and the normalization of already seen files are paid only once.
+"""
+
+import common.utils.stdout as stdout
+
+from common.objects.index import CorpusIndex
+from common.objects.parser import SERVE_ARGUMENT_PARSER
+from common.objects.server import ComparisonServer
+
+
+if __name__ == "__main__":
+
+    args = SERVE_ARGUMENT_PARSER.parse_args()
+    if args.max_programs < 2:
+        SERVE_ARGUMENT_PARSER.error("the number of kept files must be at least 2")
+
+    index = None
+    if args.index is not None:
+        stdout.message(title="SERVER", msg="Loading the corpus index.")
+        index = CorpusIndex.load(args.index)
+
+    server = ComparisonServer(
+        (args.host, args.port),
+        index=index,
+        max_programs=args.max_programs,
+    )
+    stdout.message(title="SERVER", msg=f"Listening on http://{args.host}:{args.port}.")
+
+    try:
+        server.serve_forever()
+
+    except KeyboardInterrupt:
+        stdout.newline()
+
+    server.server_close()
+    stdout.message(title="SERVER", msg="Status: FINISHED.")